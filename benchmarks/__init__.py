@@ -0,0 +1 @@
+"""Benchmarks for the NIU integration."""
@@ -0,0 +1,175 @@
+"""In-process stand-in for the NIU cloud used by the benchmarks.
+
+The fake server is an ``httpx.MockTransport`` so the real ``NiuApi`` request
+path (client, headers, JSON decoding) is exercised without touching the
+network. Each endpoint answers after a configurable latency.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+import math
+import random
+import time
+
+from custom_components.niu.const import (
+    IGNITION_URI,
+    LOGIN_URI,
+    MOTOINFO_ALL_API_URI,
+    MOTOINFO_LIST_API_URI,
+    MOTOR_BATTERY_API_URI,
+    MOTOR_INDEX_API_URI,
+    TRACK_LIST_API_URI,
+)
+from custom_components.niu.scheduler import NiuRequestScheduler
+from custom_components.niu.session import NiuAccountSession
+import httpx
+
+SN = "BENCH000000000001"
+
+RESPONSES = {
+    MOTOINFO_LIST_API_URI: {
+        "status": 0,
+        "data": {"items": [{"sn_id": SN, "scooter_name": "Bench"}]},
+    },
+    MOTOR_BATTERY_API_URI: {
+        "status": 0,
+        "data": {
+            "batteries": {
+                "compartmentA": {
+                    "bmsId": "BMS1",
+                    "isConnected": True,
+                    "batteryCharging": 80,
+                    "chargedTimes": 120,
+                    "temperature": 21,
+                    "temperatureDesc": "normal",
+                    "gradeBattery": 95,
+                }
+            }
+        },
+    },
+    MOTOR_INDEX_API_URI: {
+        "status": 0,
+        "data": {
+            "isConnected": True,
+            "isCharging": 0,
+            "isAccOn": 0,
+            "lockStatus": 1,
+            "nowSpeed": 0,
+            "leftTime": 3,
+            "estimatedMileage": 42,
+            "centreCtrlBattery": 100,
+            "hdop": 1,
+            "gsm": 20,
+            "gps": 4,
+            "postion": {"lat": 45.4642, "lng": 9.19},
+            "lastTrack": {"distance": 1200, "ridingTime": 300, "time": 1700000000},
+        },
+    },
+    MOTOINFO_ALL_API_URI: {
+        "status": 0,
+        "data": {"totalMileage": 1523, "bindDaysCount": 400},
+    },
+    TRACK_LIST_API_URI: {
+        "status": 0,
+        "data": [
+            {
+                "trackId": "T1",
+                "startTime": 1700000000000,
+                "endTime": 1700000300000,
+                "distance": 1200,
+                "avespeed": 14,
+                "ridingtime": 300,
+                "track_thumb": "https://app-api-fk.niu.com/track/overseas/thumb/T1.jpg",
+            }
+        ],
+    },
+    IGNITION_URI: {"status": 0, "desc": "成功"},
+}
+
+
+class FakeNiuCloud:
+    """Serve canned NIU responses after a configurable latency.
+
+    ``jitter`` adds a uniformly distributed extra delay, ``error_rate`` is
+    the share of data requests answered with HTTP 500, and ``vehicles`` sets
+    the length of each account's vehicle list.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.1,
+        token_lifetime: int = 86400,
+        *,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        vehicles: int = 1,
+        seed: int | None = None,
+    ) -> None:
+        self.latency = latency
+        self.token_lifetime = token_lifetime
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.vehicles = vehicles
+        self.requests: Counter[str] = Counter()
+        self.errors = 0
+        self._random = random.Random(seed)
+
+    @property
+    def logins(self) -> int:
+        return self.requests[LOGIN_URI]
+
+    @property
+    def total_requests(self) -> int:
+        return sum(self.requests.values())
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        self.requests[path] += 1
+        delay = self.latency
+        if self.jitter:
+            delay += self._random.uniform(0, self.jitter)
+        await asyncio.sleep(delay)
+        if path == LOGIN_URI:
+            token = {"access_token": "bench-token", "expires_in": self.token_lifetime}
+            return httpx.Response(200, json={"data": {"token": token}})
+
+        if self.error_rate and self._random.random() < self.error_rate:
+            self.errors += 1
+            return httpx.Response(500)
+
+        if path == MOTOINFO_LIST_API_URI and self.vehicles > 1:
+            items = [
+                {"sn_id": f"{SN[:-4]}{index:04d}", "scooter_name": f"Bench {index}"}
+                for index in range(self.vehicles)
+            ]
+            return httpx.Response(200, json={"status": 0, "data": {"items": items}})
+
+        payload = RESPONSES.get(path)
+        if payload is None:
+            return httpx.Response(404)
+        return httpx.Response(200, json=payload)
+
+    def client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(transport=httpx.MockTransport(self.handle))
+
+
+def unthrottled_session(client: httpx.AsyncClient) -> NiuAccountSession:
+    """Return a session whose requests are never held by the rate limiter.
+
+    Refresh benchmarks measure endpoint fan-out, not the account pacing.
+    """
+    return NiuAccountSession(
+        "bench",
+        "bench",
+        client=client,
+        scheduler=NiuRequestScheduler(rate=math.inf, burst=math.inf),
+    )
+
+
+async def timed(coro) -> float:
+    """Await ``coro`` and return its wall-clock duration in seconds."""
+    start = time.perf_counter()
+    await coro
+    return time.perf_counter() - start
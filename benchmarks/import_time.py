@@ -0,0 +1,104 @@
+"""Import-time regression check for the NIU integration.
+
+Imports ``custom_components.niu`` in fresh interpreters, after the Home
+Assistant modules that are always loaded before a custom integration, and
+measures what the integration adds. Fails when the median import exceeds
+the budget or when a module that only a platform, the config flow or an
+optional feature needs is loaded at import time.
+
+Run from the repository root::
+
+    python -m benchmarks.import_time --budget-ms 150 --runs 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Loaded by Home Assistant before any custom integration is imported
+BASELINE_MODULES = (
+    "homeassistant.config_entries",
+    "homeassistant.core",
+    "homeassistant.exceptions",
+    "homeassistant.helpers.event",
+    "homeassistant.helpers.httpx_client",
+    "homeassistant.helpers.storage",
+    "homeassistant.helpers.update_coordinator",
+    "homeassistant.util.dt",
+    "httpx",
+)
+
+# Modules setup must not pull in; they belong to platforms, flows or extras
+FORBIDDEN_PREFIXES = (
+    "PIL",
+    "requests",
+    "voluptuous",
+    "homeassistant.components.camera",
+    "homeassistant.components.generic",
+    "homeassistant.components.recorder",
+    "homeassistant.components.sensor",
+    "homeassistant.helpers.config_validation",
+    "homeassistant.helpers.selector",
+)
+
+PROBE = """
+import importlib, json, sys, time
+for name in {baseline!r}:
+    importlib.import_module(name)
+before = set(sys.modules)
+start = time.perf_counter()
+import custom_components.niu
+elapsed = time.perf_counter() - start
+print(json.dumps({{"ms": elapsed * 1000, "modules": sorted(set(sys.modules) - before)}}))
+"""
+
+
+def probe() -> dict:
+    """Import the integration once in a fresh interpreter."""
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE.format(baseline=BASELINE_MODULES)],
+        cwd=REPO_ROOT,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--budget-ms", type=float, default=150.0)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    results = [probe() for _ in range(args.runs)]
+    modules = results[-1]["modules"]
+    forbidden = [
+        module
+        for module in modules
+        if any(
+            module == prefix or module.startswith(prefix + ".")
+            for prefix in FORBIDDEN_PREFIXES
+        )
+    ]
+    median_ms = statistics.median(result["ms"] for result in results)
+    report = {
+        "median_ms": median_ms,
+        "budget_ms": args.budget_ms,
+        "runs": args.runs,
+        "new_modules": len(modules),
+        "forbidden_modules": forbidden,
+    }
+    print(json.dumps(report, indent=2))
+    sys.exit(1 if forbidden or median_ms > args.budget_ms else 0)
+
+
+if __name__ == "__main__":
+    main()
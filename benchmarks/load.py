@@ -0,0 +1,222 @@
+"""Fleet-scale load harness for the NIU integration.
+
+Sets up many config entries, spread over several accounts, in one Home
+Assistant instance against ``FakeNiuCloud``, then polls every coordinator
+at a compressed interval. Reports event-loop lag, executor queue depths,
+requests per minute and time to first data per entry as JSON.
+
+Run from the repository root::
+
+    python -m benchmarks.load --entries 200 --per-account 10 \\
+        --latency 0.2 --jitter 0.3 --error-rate 0.05 --duration 60
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from contextlib import suppress
+import json
+import math
+import random
+import statistics
+import time
+
+from custom_components.niu.const import DATA_COORDINATOR, DATA_EXECUTOR, DOMAIN
+
+from homeassistant.core import HomeAssistant
+
+from .fake_niu import FakeNiuCloud
+from .ha_env import async_test_hass, build_entry
+
+SAMPLE_INTERVAL = 0.1
+
+
+def _summary(samples) -> dict:
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "p50": ordered[len(ordered) // 2],
+        "p95": ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)],
+        "max": ordered[-1],
+        "mean": statistics.fmean(ordered),
+    }
+
+
+class LoopMonitor:
+    """Sample event-loop lag and the queue depth of both executors.
+
+    Home Assistant's default executor and the integration's own ``niu``
+    executor, which runs all blocking NIU work, are sampled separately.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass = hass
+        self.lag: list[float] = []
+        self.queue_depth: list[int] = []
+        self.niu_queue_depth: list[int] = []
+        self._task: asyncio.Task | None = None
+
+    @staticmethod
+    def _queue_depth(executor) -> int:
+        work_queue = getattr(executor, "_work_queue", None)
+        return work_queue.qsize() if work_queue is not None else 0
+
+    async def _run(self) -> None:
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(SAMPLE_INTERVAL)
+            self.lag.append(time.perf_counter() - start - SAMPLE_INTERVAL)
+            self.queue_depth.append(
+                self._queue_depth(getattr(self.hass.loop, "_default_executor", None))
+            )
+            self.niu_queue_depth.append(
+                self._queue_depth(self.hass.data.get(DOMAIN, {}).get(DATA_EXECUTOR))
+            )
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+
+    def report(self) -> dict:
+        return {
+            "event_loop_lag_s": _summary(self.lag),
+            "executor_queue_depth": _summary(self.queue_depth),
+            "niu_executor_queue_depth": _summary(self.niu_queue_depth),
+        }
+
+
+async def _async_first_data(coordinator, started: float) -> float | None:
+    """Return seconds from ``started`` until the coordinator has data."""
+    if coordinator.data is not None and coordinator.last_update_success:
+        return time.perf_counter() - started
+
+    ready = asyncio.Event()
+
+    def _listener() -> None:
+        if coordinator.data is not None and coordinator.last_update_success:
+            ready.set()
+
+    unsub = coordinator.async_add_listener(_listener)
+    try:
+        await ready.wait()
+    finally:
+        unsub()
+    return time.perf_counter() - started
+
+
+async def _async_poll(coordinator, interval: float, deadline: float) -> int:
+    """Refresh every group of a coordinator until ``deadline``."""
+    refreshes = 0
+    await asyncio.sleep(random.uniform(0, interval))
+    while time.perf_counter() < deadline:
+        await coordinator.async_refresh_groups(*coordinator.intervals)
+        refreshes += 1
+        await asyncio.sleep(interval)
+    return refreshes
+
+
+async def run_load(args) -> dict:
+    cloud = FakeNiuCloud(
+        args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        vehicles=args.per_account,
+        seed=args.seed,
+    )
+    random.seed(args.seed)
+    async with async_test_hass(cloud) as hass:
+        monitor = LoopMonitor(hass)
+        monitor.start()
+
+        entries = [
+            build_entry(
+                username=f"bench{index // args.per_account}",
+                scooter_id=index % args.per_account,
+            )
+            for index in range(args.entries)
+        ]
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(hass.config_entries.async_add(entry) for entry in entries)
+        )
+        setup_s = time.perf_counter() - started
+
+        coordinators = [
+            hass.data[DOMAIN][entry.entry_id][DATA_COORDINATOR]
+            for entry in entries
+            if entry.entry_id in hass.data.get(DOMAIN, {})
+        ]
+        first_data = []
+        for result in await asyncio.gather(
+            *(
+                asyncio.wait_for(
+                    _async_first_data(coordinator, started), args.first_data_timeout
+                )
+                for coordinator in coordinators
+            ),
+            return_exceptions=True,
+        ):
+            if not isinstance(result, BaseException):
+                first_data.append(result)
+
+        requests_before = cloud.total_requests
+        poll_started = time.perf_counter()
+        deadline = poll_started + args.duration
+        refreshes = await asyncio.gather(
+            *(
+                _async_poll(coordinator, args.poll_interval, deadline)
+                for coordinator in coordinators
+            )
+        )
+        poll_s = time.perf_counter() - poll_started
+        await monitor.stop()
+
+        return {
+            "params": vars(args),
+            "accounts": math.ceil(args.entries / args.per_account),
+            "entries_loaded": len(coordinators),
+            "setup_s": setup_s,
+            "time_to_first_data_s": _summary(first_data),
+            "entries_without_data": len(coordinators) - len(first_data),
+            "logins": cloud.logins,
+            "injected_errors": cloud.errors,
+            "refreshes": sum(refreshes),
+            "requests_per_minute": (cloud.total_requests - requests_before)
+            * 60
+            / poll_s,
+            **monitor.report(),
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entries", type=int, default=50)
+    parser.add_argument("--per-account", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--poll-interval", type=float, default=5.0)
+    parser.add_argument("--first-data-timeout", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write results to this file")
+    args = parser.parse_args()
+
+    document = json.dumps(asyncio.run(run_load(args)), indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(document + "\n")
+    else:
+        print(document)
+
+
+if __name__ == "__main__":
+    main()
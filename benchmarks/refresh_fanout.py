@@ -0,0 +1,58 @@
+"""Compare sequential and concurrent ``async_refresh_all_data``.
+
+Run from the repository root::
+
+    python -m benchmarks.refresh_fanout --latency 0.2 --rounds 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+
+from custom_components.niu.api import NiuApi
+
+from .fake_niu import FakeNiuCloud, timed, unthrottled_session
+
+
+async def _run(latency: float, rounds: int) -> dict:
+    cloud = FakeNiuCloud(latency)
+    async with cloud.client() as client:
+        api = NiuApi(
+            "bench",
+            "bench",
+            0,
+            "en-US",
+            client=client,
+            session=unthrottled_session(client),
+        )
+        await api.async_init_metadata()
+
+        results = {}
+        for mode, concurrent in (("sequential", False), ("concurrent", True)):
+            samples = [
+                await timed(api.async_refresh_all_data(concurrent=concurrent))
+                for _ in range(rounds)
+            ]
+            results[mode] = {"mean_s": statistics.fmean(samples), "max_s": max(samples)}
+
+    results["speedup"] = (
+        results["sequential"]["mean_s"] / results["concurrent"]["mean_s"]
+    )
+    results["latency_s"] = latency
+    results["rounds"] = rounds
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(_run(args.latency, args.rounds)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Recorder-enabled check of the long-term statistics import.
+
+Builds a real snapshot from ``FakeNiuCloud`` payloads, feeds it to
+``NiuStatistics`` with the recorder loaded, flushes the completed hours and
+reads the imported rows back. The benchmark Home Assistant does not load the
+recorder, so this is the only harness that runs the statistics path.
+
+Run from the repository root::
+
+    python -m benchmarks.statistics_check
+"""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+import json
+import os
+import sys
+import tempfile
+
+from custom_components.niu.api import NiuApi
+from custom_components.niu.history import NiuRideHistory
+from custom_components.niu.statistics import NiuStatistics
+
+from homeassistant import config_entries, core, loader
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.statistics import statistics_during_period
+from homeassistant.helpers import recorder as recorder_helper, translation
+from homeassistant.setup import async_setup_component
+from homeassistant.util import dt as dt_util
+
+from .fake_niu import FakeNiuCloud, unthrottled_session
+
+HOURS = 2
+
+
+async def _async_snapshot(cloud: FakeNiuCloud):
+    async with cloud.client() as client:
+        api = NiuApi(
+            "bench",
+            "bench",
+            0,
+            "en-US",
+            client=client,
+            session=unthrottled_session(client),
+        )
+        await api.async_init_metadata()
+        snapshot = await api.async_refresh_all_data()
+        await api.session.async_close()
+    return api, snapshot
+
+
+async def _run() -> dict:
+    api, snapshot = await _async_snapshot(FakeNiuCloud(0))
+    with tempfile.TemporaryDirectory(prefix="niu-stats-") as config_dir:
+        hass = core.HomeAssistant(config_dir)
+        loader.async_setup(hass)
+        translation.async_setup(hass)
+        recorder_helper.async_initialize_recorder(hass)
+        hass.config_entries = config_entries.ConfigEntries(hass, {})
+        await hass.config_entries.async_initialize()
+        db_url = f"sqlite:///{os.path.join(config_dir, 'check.db')}"
+        assert await async_setup_component(
+            hass, "recorder", {"recorder": {"db_url": db_url}}
+        )
+        await hass.async_start()
+        recorder = get_instance(hass)
+        try:
+            statistics = NiuStatistics(
+                hass, api.sn, api.sensor_prefix, NiuRideHistory(hass, api)
+            )
+            start = dt_util.utcnow().replace(
+                minute=0, second=0, microsecond=0
+            ) - timedelta(hours=HOURS + 1)
+            for hour in range(HOURS):
+                statistics.async_add_snapshot(
+                    snapshot, now=start + timedelta(hours=hour, minutes=5)
+                )
+            await statistics.async_flush(now=start + timedelta(hours=HOURS, minutes=5))
+            await recorder.async_block_till_done()
+
+            ids = {statistics.statistic_id(kind) for kind in ("battery", "mileage")}
+            rows = await recorder.async_add_executor_job(
+                statistics_during_period,
+                hass,
+                start,
+                None,
+                ids,
+                "hour",
+                None,
+                {"mean", "state", "sum"},
+            )
+        finally:
+            await hass.async_stop(force=True)
+
+    return {
+        statistic_id: len(rows.get(statistic_id, [])) for statistic_id in sorted(ids)
+    }
+
+
+def main() -> None:
+    report = asyncio.run(_run())
+    print(json.dumps(report, indent=2))
+    sys.exit(0 if all(count == HOURS for count in report.values()) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""Benchmark suite for the NIU integration against ``FakeNiuCloud``.
+
+Measures refresh latency of ``NiuApi.async_refresh_all_data``, setup time of
+``async_setup_entry``, time to first data, logins, executor threads and
+memory per entity. Results are written as one JSON document so they can be
+stored and compared between commits.
+
+Run from the repository root::
+
+    python -m benchmarks.suite --latency 0.1 --output bench.json
+    python -m benchmarks.suite --compare bench.json --tolerance 0.2
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+
+from custom_components.niu.api import NiuApi
+from custom_components.niu.const import DOMAIN
+
+from homeassistant.const import __version__ as HA_VERSION
+from homeassistant.helpers import entity_registry as er
+
+from .fake_niu import FakeNiuCloud, timed, unthrottled_session
+from .ha_env import async_test_hass, async_wait_for_first_data, build_entry
+
+# Metrics where a higher value is a regression, used by --compare
+LOWER_IS_BETTER = (
+    "refresh.concurrent.mean_s",
+    "refresh.concurrent.p95_s",
+    "setup.setup_entry_s",
+    "setup.time_to_first_data_s",
+    "setup.executor_threads",
+    "setup.memory_per_entity_bytes",
+    "polling.logins_per_hour",
+    "polling.requests_per_refresh",
+)
+
+
+def _percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+async def bench_refresh(latency: float, rounds: int) -> dict:
+    """Time sequential and concurrent refreshes on a bare ``NiuApi``."""
+    cloud = FakeNiuCloud(latency)
+    results = {}
+    async with cloud.client() as client:
+        api = NiuApi(
+            "bench",
+            "bench",
+            0,
+            "en-US",
+            client=client,
+            session=unthrottled_session(client),
+        )
+        await api.async_init_metadata()
+        for mode, concurrent in (("sequential", False), ("concurrent", True)):
+            samples = [
+                await timed(api.async_refresh_all_data(concurrent=concurrent))
+                for _ in range(rounds)
+            ]
+            results[mode] = {
+                "mean_s": statistics.fmean(samples),
+                "p95_s": _percentile(samples, 0.95),
+            }
+        await api.session.async_close()
+    return results
+
+
+async def bench_setup(latency: float) -> dict:
+    """Set up one entry in Home Assistant and measure its cost."""
+    cloud = FakeNiuCloud(latency)
+    async with async_test_hass(cloud) as hass:
+        entry = build_entry()
+        threads_before = threading.active_count()
+        tracemalloc.start()
+        memory_before = tracemalloc.get_traced_memory()[0]
+
+        start = time.perf_counter()
+        await hass.config_entries.async_add(entry)
+        setup_s = time.perf_counter() - start
+        await async_wait_for_first_data(hass, entry)
+        first_data_s = time.perf_counter() - start
+        await hass.async_block_till_done()
+
+        memory = tracemalloc.get_traced_memory()[0] - memory_before
+        tracemalloc.stop()
+        entities = er.async_entries_for_config_entry(er.async_get(hass), entry.entry_id)
+        return {
+            "setup_entry_s": setup_s,
+            "time_to_first_data_s": first_data_s,
+            "setup_requests": cloud.total_requests,
+            "setup_logins": cloud.logins,
+            "executor_threads": threading.active_count() - threads_before,
+            "entities": len(entities),
+            "memory_per_entity_bytes": memory // max(len(entities), 1),
+        }
+
+
+async def bench_polling(latency: float, duration: float, token_lifetime: int) -> dict:
+    """Refresh an entry back to back and count logins and requests.
+
+    A short ``token_lifetime`` makes token renewal visible within a short
+    run; the login count is scaled to one hour of wall-clock time.
+    """
+    cloud = FakeNiuCloud(latency, token_lifetime=token_lifetime)
+    async with async_test_hass(cloud) as hass:
+        entry = build_entry()
+        await hass.config_entries.async_add(entry)
+        coordinator = await async_wait_for_first_data(hass, entry)
+        logins_before = cloud.logins
+        requests_before = cloud.total_requests
+
+        refreshes = 0
+        deadline = time.perf_counter() + duration
+        while time.perf_counter() < deadline:
+            await coordinator.async_refresh_groups(*coordinator.intervals)
+            refreshes += 1
+
+        logins = cloud.logins - logins_before
+        return {
+            "duration_s": duration,
+            "token_lifetime_s": token_lifetime,
+            "refreshes": refreshes,
+            "logins_per_hour": logins * 3600 / duration,
+            "requests_per_refresh": (cloud.total_requests - requests_before)
+            / max(refreshes, 1),
+        }
+
+
+async def run_suite(args) -> dict:
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "homeassistant": HA_VERSION,
+            "domain": DOMAIN,
+            "latency_s": args.latency,
+            "timestamp": time.time(),
+        },
+        "refresh": await bench_refresh(args.latency, args.rounds),
+        "setup": await bench_setup(args.latency),
+        "polling": await bench_polling(
+            args.latency, args.duration, args.token_lifetime
+        ),
+    }
+
+
+def _lookup(results, path):
+    for part in path.split("."):
+        results = results[part]
+    return results
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Return the metrics that got worse than ``baseline`` by over ``tolerance``."""
+    regressions = []
+    for path in LOWER_IS_BETTER:
+        try:
+            old, new = _lookup(baseline, path), _lookup(current, path)
+        except KeyError:
+            continue
+        if new > old * (1 + tolerance) and new - old > 1e-6:
+            regressions.append(f"{path}: {old:.6g} -> {new:.6g}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--token-lifetime", type=int, default=86400)
+    parser.add_argument("--output", help="write results to this file")
+    parser.add_argument("--compare", help="baseline results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    results = asyncio.run(run_suite(args))
+    document = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(document + "\n")
+    else:
+        print(document)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
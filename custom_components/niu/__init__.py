@@ -5,8 +5,9 @@ from __future__ import annotations
 import logging
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers.storage import Store
 
 from .api import NiuApi
 from .const import (
@@ -15,17 +16,37 @@ from .const import (
     CONF_PASSWORD,
     CONF_SCOOTER_ID,
     CONF_SENSORS,
+    CONF_TOKEN_DATA,
     CONF_USERNAME,
     DATA_API,
     DATA_COORDINATOR,
+    DATA_HISTORY,
+    DATA_SETTINGS,
     DOMAIN,
-    normalize_sensor_selections,
     PLATFORMS,
+    normalize_sensor_selections,
 )
 from .coordinator import NiuDataUpdateCoordinator, NiuMetadata
+from .executor import async_shutdown_executor
+from .history import NiuRideHistory, async_remove_history
+from .session import (
+    NiuAccountSession,
+    async_acquire_session,
+    async_release_session,
+    async_remove_vehicles,
+)
+from .statistics import NiuStatistics
 
 _LOGGER = logging.getLogger(__name__)
 
+SNAPSHOT_STORAGE_VERSION = 1
+
+
+def _snapshot_store(hass: HomeAssistant, entry: ConfigEntry) -> Store[dict]:
+    return Store(
+        hass, SNAPSHOT_STORAGE_VERSION, f"{DOMAIN}.snapshot.{entry.entry_id}"
+    )
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up NIU e-Scooter Integration from a config entry."""
@@ -40,73 +61,234 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     hass.data.setdefault(DOMAIN, {})
 
+    session = async_acquire_session(
+        hass, niu_auth[CONF_USERNAME], niu_auth[CONF_PASSWORD]
+    )
+    try:
+        return await _async_setup_scooter(hass, entry, session, platforms)
+    except BaseException:
+        # Without this the account session would never be closed
+        hass.data[DOMAIN].pop(entry.entry_id, None)
+        await async_release_session(hass, session)
+        raise
+
+
+async def _async_setup_scooter(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    session: NiuAccountSession,
+    platforms: list[str],
+) -> bool:
+    """Set up the scooter of an entry on an acquired account session."""
+    niu_auth = entry.data[CONF_AUTH]
     username = niu_auth[CONF_USERNAME]
     password = niu_auth[CONF_PASSWORD]
     scooter_id = niu_auth[CONF_SCOOTER_ID]
     language = niu_auth[CONF_LANGUAGE]
 
-    api = NiuApi(username, password, scooter_id, language, hass, entry)
-    metadata_ready = await hass.async_add_executor_job(api.init_metadata)
-    if not metadata_ready:
-        raise ConfigEntryNotReady("Unable to initialize NIU scooter metadata")
+    api = NiuApi(
+        username, password, scooter_id, language, hass, entry, session=session
+    )
+    # Start from the last good snapshot when there is one, so entities are
+    # available at once and metadata is only revalidated in the background
+    snapshot_store = _snapshot_store(hass, entry)
+    stored = await snapshot_store.async_load()
+    restored = bool(stored) and api.restore(stored)
+    if not restored:
+        metadata_ready = await api.async_init_metadata()
+        if not metadata_ready:
+            raise ConfigEntryNotReady("Unable to initialize NIU scooter metadata")
+
+        if api.has_unsaved_token():
+            await api.async_save_token()
 
-    if api.has_unsaved_token():
-        await api.async_save_token()
+    @callback
+    def _async_token_renewed() -> None:
+        if api.has_unsaved_token():
+            hass.async_create_task(api.async_save_token())
+
+    entry.async_on_unload(session.async_add_token_listener(_async_token_renewed))
+
+    @callback
+    def _async_vehicles_changed() -> None:
+        # Setup may have used a stored list; reload if this scooter moved
+        if api.scooter_metadata(session.vehicles) != (api.sn, api.sensor_prefix):
+            _LOGGER.info("NIU scooter %s changed, reloading entry", api.sn)
+            hass.config_entries.async_schedule_reload(entry.entry_id)
+
+    entry.async_on_unload(session.async_add_vehicles_listener(_async_vehicles_changed))
+
+    history = NiuRideHistory(hass, api)
+    await history.async_load()
 
     coordinator = NiuDataUpdateCoordinator(
         hass,
         entry,
         api,
         NiuMetadata(sn=api.sn, sensor_prefix=api.sensor_prefix),
+        history,
+        NiuStatistics(hass, api.sn, api.sensor_prefix, history),
+        snapshot_store,
     )
+    if restored:
+        api.dataHistory = history.aggregates()
+        snapshot = api.build_snapshot()
+        if snapshot.has_data:
+            coordinator.data = snapshot
 
     hass.data[DOMAIN][entry.entry_id] = {
         DATA_API: api,
         DATA_COORDINATOR: coordinator,
+        DATA_HISTORY: history,
+        DATA_SETTINGS: _entry_settings(entry),
     }
 
     async def ignition_service(call) -> None:
         ignition = call.data.get("ignition")
-        service_scooter_id = call.data.get("scooterId", scooter_id)
+        service_scooter_id = int(call.data.get("scooterId", scooter_id))
         service_api = api
+        service_coordinator = coordinator
 
-        if int(service_scooter_id) != int(scooter_id):
-            service_api = NiuApi(
-                username,
-                password,
-                service_scooter_id,
-                language,
-                hass,
-                entry,
+        if service_scooter_id != int(scooter_id):
+            service_api, service_coordinator = await _async_get_scooter_api(
+                hass, session, service_scooter_id, language
             )
-            initialized = await hass.async_add_executor_job(service_api.init_metadata)
-            if not initialized:
+            if service_api is None:
                 _LOGGER.error(
                     "Unable to initialize NIU metadata for scooterId %s",
                     service_scooter_id,
                 )
                 return
 
-        result = await hass.async_add_executor_job(service_api.setIgnition, ignition)
+        if service_coordinator is not None:
+            await service_coordinator.async_set_ignition(ignition)
+            return
+
+        await service_api.async_set_ignition(ignition)
         if service_api.has_unsaved_token():
             await service_api.async_save_token()
 
-        if result and service_api is api:
-            await coordinator.async_refresh()
-
     hass.services.async_register(DOMAIN, "set_scooter_ignition", ignition_service)
     entry.async_on_unload(entry.add_update_listener(async_update_entry))
 
     await hass.config_entries.async_forward_entry_setups(entry, platforms)
+    if restored:
+        entry.async_create_background_task(
+            hass,
+            _async_revalidate_metadata(hass, entry, api),
+            f"niu_metadata_{api.sn}",
+        )
     hass.async_create_task(coordinator.async_refresh())
     return True
 
 
+async def _async_revalidate_metadata(
+    hass: HomeAssistant, entry: ConfigEntry, api: NiuApi
+) -> None:
+    """Check restored metadata against the account and reload if it changed."""
+    restored_metadata = (api.sn, api.sensor_prefix)
+    if not await api.async_init_metadata():
+        _LOGGER.warning("Unable to revalidate NIU metadata of scooter %s", api.sn)
+        return
+
+    if api.has_unsaved_token():
+        await api.async_save_token()
+
+    if (api.sn, api.sensor_prefix) != restored_metadata:
+        _LOGGER.info("NIU scooter %s changed, reloading entry", restored_metadata[0])
+        hass.config_entries.async_schedule_reload(entry.entry_id)
+
+
+async def _async_get_scooter_api(
+    hass: HomeAssistant, session: NiuAccountSession, scooter_id: int, language: str
+) -> tuple[NiuApi | None, NiuDataUpdateCoordinator | None]:
+    """Return an initialized API handle for another scooter on the account.
+
+    A config entry that already manages the scooter is reused together with its
+    coordinator; otherwise handles are kept in the session's LRU cache so
+    repeated service calls skip the metadata lookup.
+    """
+    for config_entry in hass.config_entries.async_entries(DOMAIN):
+        entry_data = hass.data[DOMAIN].get(config_entry.entry_id)
+        if entry_data is None:
+            continue
+
+        entry_api = entry_data[DATA_API]
+        if entry_api.session is session and entry_api.scooter_id == scooter_id:
+            return entry_api, entry_data[DATA_COORDINATOR]
+
+    cache_key = (scooter_id, language)
+    service_api = session.api_cache.get(cache_key)
+    if service_api is not None:
+        return service_api, None
+
+    service_api = NiuApi(
+        session.username,
+        session.password,
+        scooter_id,
+        language,
+        hass,
+        session=session,
+    )
+    if not await service_api.async_init_metadata():
+        return None, None
+
+    session.api_cache.put(cache_key, service_api)
+    return service_api, None
+
+
+def _entry_settings(entry: ConfigEntry) -> tuple[dict, dict]:
+    """Return the entry data and options that need a reload when changed."""
+    data = {
+        key: value for key, value in entry.data.items() if key != CONF_TOKEN_DATA
+    }
+    return data, dict(entry.options)
+
+
 async def async_update_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Reload the integration when options are updated."""
+    entry_data = hass.data.get(DOMAIN, {}).get(entry.entry_id)
+    if entry_data is not None and entry_data[DATA_SETTINGS] == _entry_settings(entry):
+        # Only the saved token changed, e.g. after a background renewal
+        return
     await hass.config_entries.async_reload(entry.entry_id)
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the files a deleted entry persisted.
+
+    The ride history goes unless another entry uses the same scooter, and
+    the account's vehicle list goes with the account's last entry.
+    """
+    niu_auth = entry.data.get(CONF_AUTH, {})
+    username = niu_auth.get(CONF_USERNAME)
+    others = [
+        other.data.get(CONF_AUTH, {})
+        for other in hass.config_entries.async_entries(DOMAIN)
+        if other.entry_id != entry.entry_id
+    ]
+    same_account = [other for other in others if other.get(CONF_USERNAME) == username]
+
+    snapshot_store = _snapshot_store(hass, entry)
+    stored = await snapshot_store.async_load()
+    sn = ((stored or {}).get("metadata") or {}).get("sn")
+    if sn and not any(
+        str(other.get(CONF_SCOOTER_ID)) == str(niu_auth.get(CONF_SCOOTER_ID))
+        for other in same_account
+    ):
+        await async_remove_history(hass, sn)
+    await snapshot_store.async_remove()
+
+    if username and not same_account:
+        await async_remove_vehicles(hass, username)
+    if not any(
+        config_entry.entry_id in hass.data.get(DOMAIN, {})
+        for config_entry in hass.config_entries.async_entries(DOMAIN)
+    ):
+        # Removing the history may have restarted the executor
+        async_shutdown_executor(hass)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     niu_auth = entry.data.get(CONF_AUTH, {})
@@ -118,6 +300,12 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     unload_ok = await hass.config_entries.async_unload_platforms(entry, platforms)
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id)
+        entry_data = hass.data[DOMAIN].pop(entry.entry_id)
+        await async_release_session(hass, entry_data[DATA_API].session)
+        if not any(
+            config_entry.entry_id in hass.data[DOMAIN]
+            for config_entry in hass.config_entries.async_entries(DOMAIN)
+        ):
+            async_shutdown_executor(hass)
 
     return unload_ok
@@ -1,22 +1,30 @@
-from datetime import datetime
-import hashlib
-import json
+import asyncio
 import logging
-import time
-from time import gmtime, strftime
-from typing import Any
 
 import httpx
-import requests
 
 from .const import *
+from .session import NiuAccountSession
+from .snapshot import EMPTY_SNAPSHOT, NiuSnapshot
 
 _LOGGER = logging.getLogger(__name__)
 
 
+class NiuApiError(Exception):
+    """Raised when a NIU request fails where a falsy result is ambiguous."""
+
+
 class NiuApi:
     def __init__(
-        self, username, password, scooter_id, language, hass=None, entry=None
+        self,
+        username,
+        password,
+        scooter_id,
+        language,
+        hass=None,
+        entry=None,
+        client: httpx.AsyncClient | None = None,
+        session: NiuAccountSession | None = None,
     ) -> None:
         self.username = username
         self.password = password
@@ -24,40 +32,52 @@ class NiuApi:
         self.language = language
         self.hass = hass
         self.entry = entry
+        self.session = session or NiuAccountSession(username, password, hass, client)
 
         self.dataBat = None
         self.dataMoto = None
         self.dataMotoInfo = None
         self.dataTrackInfo = None
+        self.dataHistory = None
+        # Endpoint groups that returned fresh data in the last refresh
+        self.refreshed_groups: set[str] = set()
+        self.snapshot = EMPTY_SNAPSHOT
         self.sn = None
         self.sensor_prefix = None
 
-        self.token = None
-        self.token_expires_at = None
+    @property
+    def token(self):
+        return self.session.token
 
-    def initApi(self):
-        metadata = self.init_metadata()
+    @property
+    def token_expires_at(self):
+        return self.session.token_expires_at
+
+    async def async_init_api(self):
+        metadata = await self.async_init_metadata()
         if not metadata:
             return False
 
-        return self.refresh_all_data() is not None
+        return await self.async_refresh_all_data() is not None
 
-    def init_metadata(self):
+    async def async_init_metadata(self):
         self._load_stored_token()
 
-        if not self._is_token_valid():
-            self.token = self.get_token()
-            if not self.token:
-                return False
-
-        vehicles = self.get_vehicles_info(MOTOINFO_LIST_API_URI)
-        if not vehicles:
+        items = await self.session.async_get_vehicles()
+        if items is not None and self.scooter_id >= len(items):
+            # The shared list may predate a scooter added to the account
+            items = await self.session.async_get_vehicles(force_refresh=True)
+        metadata = self.scooter_metadata(items)
+        if metadata is None:
             return False
 
-        items = vehicles.get("data", {}).get("items")
-        if not isinstance(items, list):
-            _LOGGER.error("Vehicle list response is missing items")
-            return False
+        self.sn, self.sensor_prefix = metadata
+        return True
+
+    def scooter_metadata(self, items) -> tuple[str, str] | None:
+        """Return the serial number and name of this scooter in a vehicle list."""
+        if items is None:
+            return None
 
         try:
             scooter = items[self.scooter_id]
@@ -66,13 +86,13 @@ class NiuApi:
                 "Configured scooter_id %s is not present in NIU vehicle list",
                 self.scooter_id,
             )
-            return False
+            return None
 
         if not isinstance(scooter, dict):
             _LOGGER.error(
                 "Vehicle list entry for scooter_id %s is invalid", self.scooter_id
             )
-            return False
+            return None
 
         sn = scooter.get("sn_id")
         sensor_prefix = scooter.get("scooter_name")
@@ -80,53 +100,20 @@ class NiuApi:
             _LOGGER.error(
                 "Vehicle list entry for scooter_id %s is incomplete", self.scooter_id
             )
-            return False
-
-        self.sn = sn
-        self.sensor_prefix = sensor_prefix
-        return True
-
-    def get_token(self):
-        url = ACCOUNT_BASE_URL + LOGIN_URI
-        md5 = hashlib.md5(self.password.encode("utf-8")).hexdigest()
-        data = {
-            "account": self.username,
-            "password": md5,
-            "grant_type": "password",
-            "scope": "base",
-            "app_id": "niu_ktdrr960",
-        }
-        try:
-            response = requests.post(url, data=data)
-        except BaseException as err:
-            _LOGGER.error("Error getting token: %s", err)
-            return False
+            return None
 
-        if response.status_code != 200:
-            _LOGGER.error(
-                "Token request failed with status code: %s", response.status_code
-            )
-            return False
+        return sn, sensor_prefix
 
-        try:
-            payload = json.loads(response.content.decode())
-            token_data = payload["data"]["token"]
-            access_token = token_data["access_token"]
-            expires_in = token_data.get("expires_in", 86400)
-            self.token_expires_at = time.time() + expires_in
-            _LOGGER.debug("Successfully obtained new token")
-            return access_token
-        except (KeyError, json.JSONDecodeError) as err:
-            _LOGGER.error("Error parsing token response: %s", err)
-            return False
+    async def async_get_token(self):
+        token = await self.session.async_get_token()
+        if token:
+            self.session.token = token
+        return token
 
     def _load_stored_token(self):
         """Load token from Home Assistant config entry."""
-        if self.entry and self.entry.data.get("token_data"):
-            token_data = self.entry.data["token_data"]
-            self.token = token_data.get("access_token")
-            self.token_expires_at = token_data.get("expires_at")
-            _LOGGER.debug("Loaded stored token")
+        if self.entry:
+            self.session.adopt_token(self.entry.data.get(CONF_TOKEN_DATA))
 
     async def async_save_token(self):
         """Save token to Home Assistant config entry."""
@@ -136,7 +123,7 @@ class NiuApi:
                 "expires_at": self.token_expires_at,
             }
             new_data = dict(self.entry.data)
-            new_data["token_data"] = token_data
+            new_data[CONF_TOKEN_DATA] = token_data
             self.hass.config_entries.async_update_entry(self.entry, data=new_data)
             _LOGGER.debug("Saved token to config entry")
 
@@ -145,206 +132,242 @@ class NiuApi:
         if not self.token or not self.hass or not self.entry:
             return False
 
-        stored_token_data = self.entry.data.get("token_data", {})
+        stored_token_data = self.entry.data.get(CONF_TOKEN_DATA, {})
         stored_token = stored_token_data.get("access_token")
         return self.token != stored_token
 
-    def _is_token_valid(self):
-        """Check if the current token is valid and not expired."""
-        if not self.token or not self.token_expires_at:
-            return False
-
-        buffer_time = 300
-        current_time = time.time()
-        return current_time < (self.token_expires_at - buffer_time)
-
-    def _ensure_valid_token(self):
-        """Ensure we have a valid token, refresh if needed."""
-        if not self._is_token_valid():
-            _LOGGER.info("Token expired or invalid, refreshing...")
-            self.token = self.get_token()
-            if self.token:
-                return True
-
-            _LOGGER.error("Failed to refresh token")
-            return False
-
-        return True
+    async def _async_ensure_valid_token(self):
+        return await self.session.async_ensure_valid_token()
 
-    def get_vehicles_info(self, path):
-        if not self._ensure_valid_token():
-            return False
-
-        url = API_BASE_URL + path
-        headers = {"token": self.token}
-        try:
-            response = requests.get(url, headers=headers, data=[])
-        except requests.RequestException:
-            return False
-
-        if response.status_code != 200:
-            return False
-
-        try:
-            data = json.loads(response.content.decode())
-        except json.JSONDecodeError:
-            return False
-
-        if not isinstance(data, dict):
-            return False
-        if data.get("status") not in (None, 0):
-            return False
-        return data
-
-    def get_info(self, path):
-        if not self._ensure_valid_token() or not self.sn:
-            return False
-
-        url = API_BASE_URL + path
-        params = {"sn": self.sn}
-        headers = {
+    def _app_headers(self):
+        return {
             "token": self.token,
             "User-Agent": "manager/5.5.8 (android; SM-S918B 14);lang="
             + self.language
             + ";clientIdentifier=Overseas;timezone=Europe/Rome;model=samsung_SM-S918B;deviceName=SM-S918B;ostype=android",
         }
-        try:
-            response = requests.get(url, headers=headers, params=params)
-        except requests.RequestException:
-            return False
-
-        if response.status_code != 200:
-            return False
 
-        try:
-            data = json.loads(response.content.decode())
-        except json.JSONDecodeError:
+    async def async_get_info(self, path, priority=PRIORITY_POLL):
+        if not await self._async_ensure_valid_token() or not self.sn:
             return False
 
-        if data.get("status") != 0:
+        data = await self.session.async_request_json(
+            "GET",
+            API_BASE_URL + path,
+            priority=priority,
+            headers=self._app_headers(),
+            params={"sn": self.sn},
+        )
+        if data is None or data.get("status") != 0:
             return False
         return data
 
-    def post_info(self, path):
-        if not self._ensure_valid_token() or not self.sn:
-            return False
-
-        url = API_BASE_URL + path
-        headers = {"token": self.token, "Accept-Language": "en-US"}
-        try:
-            response = requests.post(url, headers=headers, params={}, data={"sn": self.sn})
-        except requests.RequestException:
-            return False
-
-        if response.status_code != 200:
-            return False
-
-        try:
-            data = json.loads(response.content.decode())
-        except json.JSONDecodeError:
+    async def async_post_info(self, path, priority=PRIORITY_POLL):
+        if not await self._async_ensure_valid_token() or not self.sn:
             return False
 
-        if data.get("status") != 0:
+        data = await self.session.async_request_json(
+            "POST",
+            API_BASE_URL + path,
+            priority=priority,
+            headers={"token": self.token, "Accept-Language": "en-US"},
+            data={"sn": self.sn},
+        )
+        if data is None or data.get("status") != 0:
             return False
         return data
 
-    def post_ignition(self, path, ignition):
-        if not self._ensure_valid_token() or not self.sn:
+    async def async_post_ignition(self, path, ignition):
+        if not await self._async_ensure_valid_token() or not self.sn:
             return False
 
-        url = API_BASE_URL + path
-        headers = {
-            "token": self.token,
-            "Content-Type": "application/json",
-            "User-Agent": "manager/5.5.8 (android; SM-S918B 14);lang="
-            + self.language
-            + ";clientIdentifier=Overseas;timezone=Europe/Rome;model=samsung_SM-S918B;deviceName=SM-S918B;ostype=android",
-        }
         ignition_param = "acc_on" if ignition is True else "acc_off"
-        try:
-            response = httpx.post(
-                url, headers=headers, json={"sn": self.sn, "type": ignition_param}
-            )
-        except httpx.HTTPError:
-            return False
-
-        if response.status_code != 200:
-            return False
-
-        try:
-            data = json.loads(response.content.decode())
-        except json.JSONDecodeError:
-            return False
-
-        if data.get("desc") != "成功":
+        data = await self.session.async_request_json(
+            "POST",
+            API_BASE_URL + path,
+            priority=PRIORITY_COMMAND,
+            headers=self._app_headers(),
+            json={"sn": self.sn, "type": ignition_param},
+        )
+        if data is None or data.get("desc") != "成功":
             return False
         return True
 
-    def post_info_track(self, path):
-        if not self._ensure_valid_token() or not self.sn:
+    async def async_post_info_track(
+        self, path, index=0, page_size=10, priority=PRIORITY_POLL
+    ):
+        if not await self._async_ensure_valid_token() or not self.sn:
+            return False
+
+        data = await self.session.async_request_json(
+            "POST",
+            API_BASE_URL + path,
+            priority=priority,
+            headers={
+                "token": self.token,
+                "Accept-Language": "en-US",
+                "User-Agent": "manager/1.0.0 (identifier);clientIdentifier=identifier",
+            },
+            json={"index": str(index), "pagesize": page_size, "sn": self.sn},
+        )
+        if data is None or data.get("status") != 0:
             return False
+        return data
 
-        url = API_BASE_URL + path
-        headers = {
-            "token": self.token,
-            "Accept-Language": "en-US",
-            "User-Agent": "manager/1.0.0 (identifier);clientIdentifier=identifier",
-        }
-        try:
-            response = requests.post(
-                url,
-                headers=headers,
-                params={},
-                json={"index": "0", "pagesize": 10, "sn": self.sn},
+    async def async_iter_track_pages(self, start_page=0, page_size=TRACK_PAGE_SIZE):
+        """Yield the ride history page by page, newest rides first.
+
+        Only one page is held at a time. Raises ``NiuApiError`` when a page
+        cannot be fetched so callers never mistake a failure for the end of
+        the history.
+        """
+        page = start_page
+        while True:
+            data = await self.async_post_info_track(
+                TRACK_LIST_API_URI, page, page_size, PRIORITY_BACKGROUND
             )
-        except requests.RequestException:
-            return False
+            if not data:
+                raise NiuApiError(f"Unable to fetch ride history page {page}")
 
-        if response.status_code != 200:
-            return False
+            items = data.get("data")
+            if not isinstance(items, list):
+                raise NiuApiError(f"Ride history page {page} is malformed")
 
-        try:
-            data = json.loads(response.content.decode())
-        except json.JSONDecodeError:
-            return False
-
-        if data.get("status") != 0:
-            return False
-        return data
+            if items:
+                yield items
+            if len(items) < page_size:
+                return
+            page += 1
 
-    def _snapshot(self) -> dict[str, Any]:
+    def payloads(self) -> dict:
+        """Return the metadata and raw endpoint payloads for persisting."""
         return {
-            "battery": self.dataBat,
-            "moto": self.dataMoto,
-            "moto_info": self.dataMotoInfo,
-            "track": self.dataTrackInfo,
+            "metadata": {
+                "scooter_id": self.scooter_id,
+                "sn": self.sn,
+                "sensor_prefix": self.sensor_prefix,
+            },
+            "payloads": {
+                "bat": self.dataBat,
+                "moto": self.dataMoto,
+                "moto_info": self.dataMotoInfo,
+                "track": self.dataTrackInfo,
+            },
         }
 
-    def _update_data_field(self, attr_name, fetcher, path):
-        data = fetcher(path)
+    def restore(self, stored) -> bool:
+        """Adopt metadata and payloads persisted by a previous run.
+
+        Returns False when ``stored`` does not describe this scooter, in
+        which case nothing is changed.
+        """
+        metadata = stored.get("metadata") or {}
+        if (
+            metadata.get("scooter_id") != self.scooter_id
+            or not metadata.get("sn")
+            or not metadata.get("sensor_prefix")
+        ):
+            return False
+
+        self._load_stored_token()
+        self.sn = metadata["sn"]
+        self.sensor_prefix = metadata["sensor_prefix"]
+        payloads = stored.get("payloads") or {}
+        self.dataBat = payloads.get("bat")
+        self.dataMoto = payloads.get("moto")
+        self.dataMotoInfo = payloads.get("moto_info")
+        self.dataTrackInfo = payloads.get("track")
+        return True
+
+    def build_snapshot(self) -> NiuSnapshot:
+        self.snapshot = NiuSnapshot.from_payloads(
+            self.dataBat,
+            self.dataMoto,
+            self.dataMotoInfo,
+            self.dataTrackInfo,
+            self.dataHistory,
+        )
+        return self.snapshot
+
+    async def _async_update_data_field(
+        self, attr_name, fetcher, path, priority=PRIORITY_POLL
+    ):
+        """Fetch one endpoint and return whether it returned fresh data."""
+        # The session bounds each request with the endpoint's timeouts
+        data = await fetcher(path, priority=priority)
         if data:
             setattr(self, attr_name, data)
             return True
 
-        return getattr(self, attr_name) is not None
-
-    def refresh_all_data(self):
-        if not self.sn and not self.init_metadata():
+        return False
+
+    def _refresh_fields(self, groups=None):
+        fields = {
+            SENSOR_TYPE_BAT: ("dataBat", self.async_get_info, MOTOR_BATTERY_API_URI),
+            SENSOR_TYPE_MOTO: ("dataMoto", self.async_get_info, MOTOR_INDEX_API_URI),
+            SENSOR_TYPE_OVERALL: (
+                "dataMotoInfo",
+                self.async_post_info,
+                MOTOINFO_ALL_API_URI,
+            ),
+            SENSOR_TYPE_TRACK: (
+                "dataTrackInfo",
+                self.async_post_info_track,
+                TRACK_LIST_API_URI,
+            ),
+        }
+        if groups is None:
+            return tuple(fields.items())
+
+        return tuple((group, fields[group]) for group in groups)
+
+    async def async_refresh_all_data(
+        self, concurrent=True, groups=None, priority=PRIORITY_POLL
+    ):
+        """Refresh snapshot endpoints, merging partial results.
+
+        ``groups`` limits the refresh to the given endpoint groups (see
+        ``UPDATE_GROUPS``); every endpoint is refreshed when it is omitted.
+        ``priority`` is the scheduler priority of the endpoint requests.
+        With ``concurrent`` set the endpoints are requested at the same time,
+        so a refresh takes as long as the slowest endpoint instead of the sum
+        of all of them. The token is validated once up front so the parallel
+        requests never race each other into separate logins.
+
+        Endpoints that fail keep their last payload, so a snapshot is
+        returned as long as any data exists; ``refreshed_groups`` tells which
+        groups actually returned fresh data.
+        """
+        self.refreshed_groups = set()
+        if not self.sn and not await self.async_init_metadata():
             return None
 
-        refresh_ok = False
-        for attr_name, fetcher, path in (
-            ("dataBat", self.get_info, MOTOR_BATTERY_API_URI),
-            ("dataMoto", self.get_info, MOTOR_INDEX_API_URI),
-            ("dataMotoInfo", self.post_info, MOTOINFO_ALL_API_URI),
-            ("dataTrackInfo", self.post_info_track, TRACK_LIST_API_URI),
-        ):
-            refresh_ok = self._update_data_field(attr_name, fetcher, path) or refresh_ok
-
-        if not refresh_ok:
+        fields = self._refresh_fields(groups)
+        if concurrent:
+            if await self._async_ensure_valid_token():
+                results = await asyncio.gather(
+                    *(
+                        self._async_update_data_field(
+                            attr_name, fetcher, path, priority
+                        )
+                        for _group, (attr_name, fetcher, path) in fields
+                    )
+                )
+            else:
+                results = [False] * len(fields)
+        else:
+            results = [
+                await self._async_update_data_field(attr_name, fetcher, path, priority)
+                for _group, (attr_name, fetcher, path) in fields
+            ]
+
+        self.refreshed_groups = {
+            group for (group, _field), fresh in zip(fields, results) if fresh
+        }
+        if not self.has_snapshot_data():
             return None
 
-        return self._snapshot()
+        return self.build_snapshot()
 
     def has_snapshot_data(self):
         return any(
@@ -357,69 +380,21 @@ class NiuApi:
             )
         )
 
-    def getDataBat(self, id_field):
-        try:
-            return self.dataBat["data"]["batteries"]["compartmentA"][id_field]
-        except (KeyError, TypeError):
-            return None
-
-    def getDataMoto(self, id_field):
-        try:
-            return self.dataMoto["data"][id_field]
-        except (KeyError, TypeError):
-            return None
-
-    def getDataDist(self, id_field):
-        try:
-            return self.dataMoto["data"]["lastTrack"][id_field]
-        except (KeyError, TypeError):
-            return None
-
-    def getDataPos(self, id_field):
-        try:
-            return self.dataMoto["data"]["postion"][id_field]
-        except (KeyError, TypeError):
-            return None
-
-    def getDataOverall(self, id_field):
-        try:
-            return self.dataMotoInfo["data"][id_field]
-        except (KeyError, TypeError):
-            return None
-
-    def getDataTrack(self, id_field):
-        try:
-            if id_field in {"startTime", "endTime"}:
-                return datetime.fromtimestamp(
-                    (self.dataTrackInfo["data"][0][id_field]) / 1000
-                ).strftime("%Y-%m-%d %H:%M:%S")
-            if id_field == "ridingtime":
-                return strftime(
-                    "%H:%M:%S", gmtime(self.dataTrackInfo["data"][0][id_field])
-                )
-            if id_field == "track_thumb":
-                thumburl = self.dataTrackInfo["data"][0][id_field].replace(
-                    "app-api.niucache.com", "app-api-fk.niu.com"
-                )
-                return thumburl.replace("/track/thumb/", "/track/overseas/thumb/")
-            return self.dataTrackInfo["data"][0][id_field]
-        except (KeyError, TypeError, IndexError):
-            return None
-
-    def updateBat(self):
-        self.dataBat = self.get_info(MOTOR_BATTERY_API_URI)
-
-    def updateMoto(self):
-        self.dataMoto = self.get_info(MOTOR_INDEX_API_URI)
+    async def async_update_bat(self):
+        self.dataBat = await self.async_get_info(MOTOR_BATTERY_API_URI)
+        self.build_snapshot()
 
-    def updateMotoInfo(self):
-        self.dataMotoInfo = self.post_info(MOTOINFO_ALL_API_URI)
+    async def async_update_moto(self):
+        self.dataMoto = await self.async_get_info(MOTOR_INDEX_API_URI)
+        self.build_snapshot()
 
-    def updateTrackInfo(self):
-        self.dataTrackInfo = self.post_info_track(TRACK_LIST_API_URI)
+    async def async_update_moto_info(self):
+        self.dataMotoInfo = await self.async_post_info(MOTOINFO_ALL_API_URI)
+        self.build_snapshot()
 
-    def setIgnition(self, ignition):
-        return self.post_ignition(IGNITION_URI, ignition)
+    async def async_update_track_info(self):
+        self.dataTrackInfo = await self.async_post_info_track(TRACK_LIST_API_URI)
+        self.build_snapshot()
 
-    def ignition(self, ignition):
-        return self.setIgnition(ignition)
+    async def async_set_ignition(self, ignition):
+        return await self.async_post_ignition(IGNITION_URI, ignition)
@@ -20,9 +20,8 @@ from .const import (
     DATA_COORDINATOR,
     DOMAIN,
     normalize_sensor_selections,
-    SENSOR_TYPE_BAT,
-    SENSOR_TYPE_MOTO,
 )
+from .snapshot import BIN_SENSOR_ACCESSORS, BIN_SENSOR_FIELD_KEYS
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -68,9 +67,12 @@ class NiuBinarySensor(CoordinatorEntity, BinarySensorEntity):
         device_class,
         icon,
     ) -> None:
-        super().__init__(coordinator)
+        super().__init__(
+            coordinator, context=frozenset({BIN_SENSOR_FIELD_KEYS[name]})
+        )
         self._sensor_grp = sensor_grp
         self._id_name = id_name
+        self._accessor = BIN_SENSOR_ACCESSORS[name]
         self._attr_unique_id = (
             f"binary_sensor.niu_scooter_{self.coordinator.metadata.sn}_{sensor_id}"
         )
@@ -107,8 +109,4 @@ class NiuBinarySensor(CoordinatorEntity, BinarySensorEntity):
         }
 
     def _get_value(self):
-        if self._sensor_grp == SENSOR_TYPE_MOTO:
-            return self.coordinator.api.getDataMoto(self._id_name)
-        if self._sensor_grp == SENSOR_TYPE_BAT:
-            return self.coordinator.api.getDataBat(self._id_name)
-        return None
+        return self._accessor(self.coordinator.snapshot)
@@ -2,59 +2,79 @@
     Author: Giovanni P. (@pikka97)
 """
 
+from collections import OrderedDict
+import io
 import json
 import logging
+import time
 from typing import final
 
 import httpx
 
-from homeassistant.components.camera import CameraState
-from homeassistant.components.generic.camera import GenericCamera
-from homeassistant.helpers.httpx_client import get_async_client
+from homeassistant.components.camera import Camera, CameraState
 
 from .const import *
+from .executor import async_run_blocking
+from .thumbnail_cache import async_get_thumbnail_cache
 
 _LOGGER = logging.getLogger(__name__)
-GET_IMAGE_TIMEOUT = 10
+
+
+def _transcode_image(body, width, height, image_format):
+    """Shrink an image to fit ``width``x``height`` and re-encode it."""
+    from PIL import Image
+
+    with Image.open(io.BytesIO(body)) as image:
+        image.thumbnail((width or image.width, height or image.height))
+        output = io.BytesIO()
+        if image_format == "WEBP":
+            image.save(output, "WEBP", quality=THUMB_VARIANT_QUALITY)
+        else:
+            image.convert("RGB").save(
+                output, "JPEG", quality=THUMB_VARIANT_QUALITY, optimize=True
+            )
+
+    return output.getvalue()
 
 
 async def async_setup_entry(hass, entry, async_add_entities) -> None:
     coordinator = hass.data[DOMAIN][entry.entry_id][DATA_COORDINATOR]
     camera_name = coordinator.metadata.sensor_prefix + " Last Track Camera"
+    use_webp = entry.data.get(CONF_AUTH, {}).get(CONF_THUMB_WEBP, False)
 
-    camera_config = {
-        "name": camera_name,
-        "still_image_url": "",
-        "stream_source": None,
-        "username": None,
-        "password": None,
-        "content_type": "image/jpeg",
-        "advanced": {
-            "authentication": "basic",
-            "limit_refetch_to_url_change": False,
-            "framerate": 2,
-            "verify_ssl": True,
-        },
-    }
     async_add_entities(
         [
             LastTrackCamera(
-                hass,
                 coordinator,
-                camera_config,
-                camera_name,
                 camera_name,
+                "image/webp" if use_webp else "image/jpeg",
+                await async_get_thumbnail_cache(hass),
             )
         ]
     )
 
 
-class LastTrackCamera(GenericCamera):
+class LastTrackCamera(Camera):
     def __init__(
-        self, hass, coordinator, device_info, identifier: str, title: str
+        self,
+        coordinator,
+        name: str,
+        content_type: str,
+        thumbnail_cache,
     ) -> None:
+        super().__init__()
         self.coordinator = coordinator
-        super().__init__(hass, device_info, identifier, title)
+        self._thumbnail_cache = thumbnail_cache
+        self._variants: OrderedDict[tuple, bytes] = OrderedDict()
+        self._last_image: bytes | None = None
+        self._last_url: str | None = None
+        # Same name and unique id as when this was a generic camera entity
+        self._attr_name = name
+        self._attr_unique_id = name
+        self.content_type = content_type
+        self._image_format = (
+            "WEBP" if self.content_type == "image/webp" else "JPEG"
+        )
 
     @property
     @final
@@ -85,44 +105,122 @@ class LastTrackCamera(GenericCamera):
     async def async_camera_image(
         self, width: int | None = None, height: int | None = None
     ) -> bytes | None:
-        last_track_url = self.coordinator.api.getDataTrack("track_thumb")
+        original = await self._async_original_image()
+        if original is None:
+            return None
+
+        url, image = original
+        if not width and not height and self._image_format == "JPEG":
+            return image
+
+        self.content_type, variant = await self._async_variant(
+            url, image, width, height
+        )
+        return variant
+
+    async def _async_variant(self, url, image, width, height):
+        """Return the content type and a resized/transcoded copy of ``image``.
+
+        Variants are memoized per source URL and size. When transcoding
+        fails the original JPEG is returned with its own content type.
+        """
+        key = (url, width, height, self._image_format)
+        content_type = f"image/{self._image_format.lower()}"
+        variant = self._variants.get(key)
+        if variant is not None:
+            self._variants.move_to_end(key)
+            return content_type, variant
+
+        try:
+            variant = await async_run_blocking(
+                self.hass, _transcode_image, image, width, height, self._image_format
+            )
+        except (ImportError, OSError, ValueError) as err:
+            _LOGGER.warning("Unable to resize NIU thumbnail: %s", err)
+            return "image/jpeg", image
+
+        self._variants[key] = variant
+        while len(self._variants) > THUMB_VARIANT_CACHE_SIZE:
+            self._variants.popitem(last=False)
+        return content_type, variant
+
+    async def _async_original_image(self) -> tuple[str, bytes] | None:
+        """Return the last track thumbnail together with the URL it came from."""
+        last_track_url = self.coordinator.snapshot.track_track_thumb
         if last_track_url is None:
-            await self.coordinator.async_refresh()
-            last_track_url = self.coordinator.api.getDataTrack("track_thumb")
+            await self.coordinator.async_refresh_groups(SENSOR_TYPE_TRACK)
+            last_track_url = self.coordinator.snapshot.track_track_thumb
             if last_track_url is None:
-                return self._last_image
+                return self._last_original()
 
         if last_track_url == self._last_url and self._last_image is not None:
-            return self._last_image
+            return self._last_url, self._last_image
+
+        track_id = self.coordinator.snapshot.track_trackId
+        cached = await self._thumbnail_cache.async_get(track_id, last_track_url)
+        if cached is not None and (
+            time.time() - cached.validated_at
+            < THUMB_REVALIDATE_INTERVAL.total_seconds()
+        ):
+            return self._use_image(last_track_url, cached.body)
+
+        headers = {}
+        if cached is not None:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+
+        response = await self.coordinator.api.session.async_get_thumbnail(
+            last_track_url, headers
+        )
+        if response is None:
+            _LOGGER.error("Unable to get new camera image from %s", self.name)
+            return self._fallback_image(last_track_url, cached)
 
         try:
-            async_client = get_async_client(self.hass, verify_ssl=self.verify_ssl)
-            response = await async_client.get(
-                last_track_url, auth=self._auth, timeout=GET_IMAGE_TIMEOUT
-            )
+            if response.status_code == 304 and cached is not None:
+                self._thumbnail_cache.touch(track_id, last_track_url)
+                return self._use_image(last_track_url, cached.body)
             response.raise_for_status()
-
-            body = response.content
-            stripped = body.lstrip()
-            if stripped.startswith(b"{") or stripped.startswith(b"["):
-                try:
-                    error_payload = json.loads(body)
-                    _LOGGER.warning(
-                        "NIU thumbnail endpoint returned JSON instead of an image (URL: %s): %s",
-                        last_track_url,
-                        error_payload,
-                    )
-                except json.JSONDecodeError:
-                    pass
-                return self._last_image
-
-            self._last_image = body
-        except httpx.TimeoutException:
-            _LOGGER.error("Timeout getting camera image from %s", self._name)
-            return self._last_image
-        except (httpx.RequestError, httpx.HTTPStatusError) as err:
-            _LOGGER.error("Error getting new camera image from %s: %s", self._name, err)
-            return self._last_image
-
-        self._last_url = last_track_url
-        return self._last_image
+        except httpx.HTTPStatusError as err:
+            _LOGGER.error("Error getting new camera image from %s: %s", self.name, err)
+            return self._fallback_image(last_track_url, cached)
+
+        body = response.content
+        stripped = body.lstrip()
+        if stripped.startswith(b"{") or stripped.startswith(b"["):
+            try:
+                error_payload = json.loads(body)
+                _LOGGER.warning(
+                    "NIU thumbnail endpoint returned JSON instead of an image (URL: %s): %s",
+                    last_track_url,
+                    error_payload,
+                )
+            except json.JSONDecodeError:
+                pass
+            return self._fallback_image(last_track_url, cached)
+
+        await self._thumbnail_cache.async_put(
+            track_id,
+            last_track_url,
+            body,
+            response.headers.get("ETag"),
+            response.headers.get("Last-Modified"),
+        )
+        return self._use_image(last_track_url, body)
+
+    def _use_image(self, url, body):
+        self._last_image = body
+        self._last_url = url
+        return url, body
+
+    def _last_original(self):
+        if self._last_image is None:
+            return None
+        return self._last_url, self._last_image
+
+    def _fallback_image(self, url, cached):
+        if self._last_image is None and cached is not None:
+            return url, cached.body
+        return self._last_original()
@@ -54,15 +54,21 @@ class NiuAuthenticator:
 
     async def authenticate(self, hass):
         # For authentication testing, we don't need token storage
-        api = NiuApi(self.username, self.password, self.scooter_id, self.language)
+        api = NiuApi(
+            self.username, self.password, self.scooter_id, self.language, hass
+        )
         try:
-            token = await hass.async_add_executor_job(api.get_token)
+            token = await api.async_get_token()
             if isinstance(token, bool):
                 return token
             else:
                 return token != ""
         except:
             return False
+        finally:
+            # A private session, so a mistyped password never reaches the
+            # session shared with loaded entries of the same account
+            await api.session.async_close()
 
 
 class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
@@ -124,6 +130,9 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                 user_input[CONF_SENSORS]
             )
             auth_data[CONF_LANGUAGE] = user_input[CONF_LANGUAGE]
+            for conf_interval in CONF_UPDATE_INTERVALS.values():
+                auth_data[conf_interval] = int(user_input[conf_interval])
+            auth_data[CONF_THUMB_WEBP] = user_input[CONF_THUMB_WEBP]
 
             # Update the config entry
             self.hass.config_entries.async_update_entry(
@@ -138,6 +147,16 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
             current_auth.get(CONF_SENSORS, AVAILABLE_SENSORS)
         )
         current_language = current_auth.get(CONF_LANGUAGE, DEFAULT_LANGUAGE)
+        current_intervals = get_update_intervals(current_auth)
+        interval_selector = selector.NumberSelector(
+            selector.NumberSelectorConfig(
+                min=MIN_UPDATE_INTERVAL,
+                max=MAX_UPDATE_INTERVAL,
+                step=1,
+                unit_of_measurement="min",
+                mode=selector.NumberSelectorMode.BOX,
+            ),
+        )
 
         options_schema = vol.Schema(
             {
@@ -159,6 +178,19 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                         mode=selector.SelectSelectorMode.LIST,
                     ),
                 ),
+                **{
+                    vol.Required(
+                        conf_interval,
+                        default=int(
+                            current_intervals[group].total_seconds() // 60
+                        ),
+                    ): interval_selector
+                    for group, conf_interval in CONF_UPDATE_INTERVALS.items()
+                },
+                vol.Required(
+                    CONF_THUMB_WEBP,
+                    default=current_auth.get(CONF_THUMB_WEBP, False),
+                ): selector.BooleanSelector(),
             }
         )
 
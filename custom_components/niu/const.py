@@ -12,7 +12,7 @@ IGNITION_URI = "/v5/cmd/creat"
 # FIRMWARE_BAS_URL = '/motorota/getfirmwareversion'
 
 DOMAIN = "niu"
-PLATFORMS = ["sensor", "switch", "binary_sensor"]
+PLATFORMS = ["sensor", "switch", "binary_sensor", "device_tracker"]
 CONF_USERNAME = "username"
 CONF_PASSWORD = "password"
 CONF_SCOOTER_ID = "scooter_id"
@@ -20,10 +20,89 @@ CONF_AUTH = "conf_auth"
 CONF_SENSORS = "sensors_selected"
 CONF_LANGUAGE = "language"
 CONF_TOKEN_DATA = "token_data"
+CONF_THUMB_WEBP = "thumbnail_webp"
 DATA_API = "api"
 DATA_COORDINATOR = "coordinator"
+DATA_SESSIONS = "sessions"
+DATA_THUMBNAIL_CACHE = "thumbnail_cache"
+DATA_HISTORY = "history"
+DATA_EXECUTOR = "executor"
+DATA_SETTINGS = "settings"
 
-UPDATE_INTERVAL = timedelta(minutes=15)
+# Last good payloads are persisted per entry, coalescing saves over this delay
+SNAPSHOT_SAVE_DELAY = 60
+
+# Stored vehicle lists older than this are revalidated in the background
+VEHICLE_LIST_TTL = timedelta(days=1)
+
+# Initialized API handles kept for ignition commands to secondary scooters
+API_CACHE_SIZE = 8
+API_CACHE_TTL = timedelta(hours=1)
+
+# Last track thumbnails kept on disk, revalidated with ETag/Last-Modified
+THUMB_CACHE_DIR = "niu_thumbnails"
+THUMB_CACHE_MAX_BYTES = 20 * 1024 * 1024
+THUMB_REVALIDATE_INTERVAL = timedelta(days=7)
+# Resized thumbnail variants memoized per camera, keyed by URL and size
+THUMB_VARIANT_CACHE_SIZE = 16
+THUMB_VARIANT_QUALITY = 80
+
+# Tracker fixes inside the accuracy radius (HDOP x UERE) are not written
+GPS_UERE_METERS = 5
+GPS_MIN_ACCURACY = 10
+
+# After an ignition command only the status endpoint is polled, after each
+# of these delays in seconds, until isAccOn matches or the deadline passes
+IGNITION_POLL_DELAYS = (2, 2, 3, 5, 8, 10)
+IGNITION_CONFIRM_TIMEOUT = 30
+
+# Account-wide request pacing: token bucket refill per second and capacity
+REQUEST_RATE = 2.0
+REQUEST_BURST = 10
+# Seconds to pause an account after a 429 without a usable Retry-After
+RATE_LIMIT_BACKOFF = 60
+MAX_RATE_LIMIT_BACKOFF = 3600
+# Longest a request waits for a slot before it fails instead
+MAX_QUEUE_WAIT = 15
+# Request priorities, lower is served first
+PRIORITY_COMMAND = 0
+PRIORITY_INTERACTIVE = 1
+PRIORITY_POLL = 2
+PRIORITY_BACKGROUND = 3
+
+# Transient request failures are retried with full-jitter exponential backoff
+REQUEST_RETRIES = 2
+RETRY_BACKOFF_BASE = 1.0
+RETRY_BACKOFF_MAX = 10.0
+# Consecutive transient failures that open an endpoint's circuit, and the
+# first cooldown before it is probed again (doubled after each failed probe)
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_COOLDOWN = 60
+BREAKER_MAX_COOLDOWN = 900
+
+# Recent request latencies kept per endpoint for the p50/p95 metrics
+METRICS_LATENCY_WINDOW = 200
+
+# Ride history is synced from the paginated track list into a local store
+TRACK_PAGE_SIZE = 50
+
+# Connect and read timeouts in seconds per endpoint (see metrics.ENDPOINT_NAMES).
+# A request is also cancelled outright once their sum has passed, so a hung
+# socket never outlives a refresh.
+REQUEST_TIMEOUTS = {
+    "login": (5, 10),
+    "vehicles": (5, 10),
+    "battery": (5, 10),
+    "status": (5, 10),
+    "totals": (5, 10),
+    "tracks": (5, 20),
+    "ignition": (5, 15),
+    "thumbnail": (5, 20),
+}
+DEFAULT_REQUEST_TIMEOUT = (5, 10)
+
+# Worker threads of the executor used for blocking NIU work (files, images)
+EXECUTOR_WORKERS = 2
 
 CONF_AVAILABLE_LANGUAGES = [
     {"value": "en-US", "label": "English (US)"},
@@ -45,6 +124,44 @@ SENSOR_TYPE_OVERALL = "TOTAL"
 SENSOR_TYPE_POS = "POSITION"
 # SENSOR_TYPE_SYSTEM = 'SYSTEM'
 SENSOR_TYPE_TRACK = "TRACK"
+# Aggregates computed from the local ride history, not fetched from an endpoint
+SENSOR_TYPE_HISTORY = "HISTORY"
+
+# Endpoint groups polled by the coordinator; POSITION and DIST share the
+# MOTO endpoint so they follow its schedule.
+UPDATE_GROUPS = [
+    SENSOR_TYPE_BAT,
+    SENSOR_TYPE_MOTO,
+    SENSOR_TYPE_OVERALL,
+    SENSOR_TYPE_TRACK,
+]
+CONF_UPDATE_INTERVALS = {
+    SENSOR_TYPE_BAT: "battery_update_interval",
+    SENSOR_TYPE_MOTO: "status_update_interval",
+    SENSOR_TYPE_OVERALL: "totals_update_interval",
+    SENSOR_TYPE_TRACK: "track_update_interval",
+}
+# Minutes between refreshes of each endpoint group
+DEFAULT_UPDATE_INTERVALS = {
+    SENSOR_TYPE_BAT: 5,
+    SENSOR_TYPE_MOTO: 5,
+    SENSOR_TYPE_OVERALL: 360,
+    SENSOR_TYPE_TRACK: 30,
+}
+MIN_UPDATE_INTERVAL = 1
+MAX_UPDATE_INTERVAL = 1440
+
+# Adaptive polling: live groups are polled quickly while the scooter is riding
+# or charging, and slowed down by these factors while it is parked or offline.
+# The other groups always use their configured interval.
+VEHICLE_STATE_ACTIVE = "active"
+VEHICLE_STATE_PARKED = "parked"
+VEHICLE_STATE_OFFLINE = "offline"
+LIVE_UPDATE_GROUPS = [SENSOR_TYPE_BAT, SENSOR_TYPE_MOTO]
+ACTIVE_POLL_INTERVAL = timedelta(minutes=1)
+PARKED_POLL_FACTOR = 6
+OFFLINE_POLL_FACTOR = 12
+MAX_BACKOFF_INTERVAL = timedelta(hours=2)
 
 LEGACY_SENSOR_SELECTIONS = {
     "Isconnected": "IsBatteryConnected",
@@ -77,18 +194,15 @@ AVAILABLE_SENSORS = [
     "LastTrackAverageSpeed",
     "LastTrackRidingtime",
     "LastTrackThumb",
+    "WeeklyDistance",
+    "MonthlyDistance",
+    "YearlyDistance",
+    "WeeklyRidingTime",
+    "MonthlyRidingTime",
+    "YearlyRidingTime",
 ]
 
 
-import voluptuous as vol
-
-from homeassistant.components.sensor import PLATFORM_SCHEMA
-
-# Sensors schemas
-from homeassistant.const import CONF_MONITORED_VARIABLES
-import homeassistant.helpers.config_validation as cv
-
-
 def normalize_sensor_selections(sensors_selected):
     """Normalize stored sensor selections while keeping order stable."""
     normalized = []
@@ -100,23 +214,17 @@ def normalize_sensor_selections(sensors_selected):
     return normalized
 
 
-VALID_SENSOR_SELECTIONS = AVAILABLE_SENSORS + list(LEGACY_SENSOR_SELECTIONS)
+def get_update_intervals(niu_auth):
+    """Return the configured refresh interval of every endpoint group."""
+    intervals = {}
+    for group in UPDATE_GROUPS:
+        minutes = niu_auth.get(
+            CONF_UPDATE_INTERVALS[group], DEFAULT_UPDATE_INTERVALS[group]
+        )
+        intervals[group] = timedelta(minutes=int(minutes))
+
+    return intervals
 
-PLATFORM_SCHEMA = PLATFORM_SCHEMA.extend(
-    {
-        vol.Required(CONF_USERNAME): cv.string,
-        vol.Required(CONF_PASSWORD): cv.string,
-        vol.Optional(CONF_SCOOTER_ID, default=DEFAULT_SCOOTER_ID): cv.positive_int,
-        vol.Optional(CONF_MONITORED_VARIABLES, default=["BatteryCharge"]): vol.All(
-            cv.ensure_list,
-            [
-                vol.In(
-                    VALID_SENSOR_SELECTIONS
-                )
-            ],
-        ),
-    }
-)
 
 SENSOR_TYPES = {
     "BatteryCharge": [
@@ -274,6 +382,54 @@ SENSOR_TYPES = {
         "none",
         "mdi:map",
     ],
+    "WeeklyDistance": [
+        "weekly_distance",
+        "km",
+        "week_distance",
+        SENSOR_TYPE_HISTORY,
+        "none",
+        "mdi:map-marker-distance",
+    ],
+    "MonthlyDistance": [
+        "monthly_distance",
+        "km",
+        "month_distance",
+        SENSOR_TYPE_HISTORY,
+        "none",
+        "mdi:map-marker-distance",
+    ],
+    "YearlyDistance": [
+        "yearly_distance",
+        "km",
+        "year_distance",
+        SENSOR_TYPE_HISTORY,
+        "none",
+        "mdi:map-marker-distance",
+    ],
+    "WeeklyRidingTime": [
+        "weekly_riding_time",
+        "h",
+        "week_riding_time",
+        SENSOR_TYPE_HISTORY,
+        "none",
+        "mdi:timelapse",
+    ],
+    "MonthlyRidingTime": [
+        "monthly_riding_time",
+        "h",
+        "month_riding_time",
+        SENSOR_TYPE_HISTORY,
+        "none",
+        "mdi:timelapse",
+    ],
+    "YearlyRidingTime": [
+        "yearly_riding_time",
+        "h",
+        "year_riding_time",
+        SENSOR_TYPE_HISTORY,
+        "none",
+        "mdi:timelapse",
+    ],
 }
 
 BIN_SENSOR_TYPES = {
@@ -2,19 +2,50 @@
 
 from __future__ import annotations
 
+import asyncio
+from collections.abc import Mapping
 from dataclasses import dataclass
+from datetime import timedelta
 import logging
-from typing import Any
+import time
+from types import MappingProxyType
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
 from .api import NiuApi
-from .const import UPDATE_INTERVAL
+from .const import (
+    ACTIVE_POLL_INTERVAL,
+    CONF_AUTH,
+    IGNITION_CONFIRM_TIMEOUT,
+    IGNITION_POLL_DELAYS,
+    LIVE_UPDATE_GROUPS,
+    MAX_BACKOFF_INTERVAL,
+    OFFLINE_POLL_FACTOR,
+    PARKED_POLL_FACTOR,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_POLL,
+    SENSOR_TYPE_MOTO,
+    SENSOR_TYPE_OVERALL,
+    SENSOR_TYPE_TRACK,
+    SNAPSHOT_SAVE_DELAY,
+    UPDATE_GROUPS,
+    VEHICLE_STATE_ACTIVE,
+    VEHICLE_STATE_OFFLINE,
+    VEHICLE_STATE_PARKED,
+    get_update_intervals,
+)
+from .history import NiuRideHistory
+from .snapshot import EMPTY_SNAPSHOT, NiuSnapshot
+from .statistics import NiuStatistics
 
 _LOGGER = logging.getLogger(__name__)
 
+# Groups falling due within this many seconds of a tick are refreshed with it
+SCHEDULE_TOLERANCE = 1.0
+
 
 @dataclass(slots=True)
 class NiuMetadata:
@@ -24,8 +55,27 @@ class NiuMetadata:
     sensor_prefix: str
 
 
-class NiuDataUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
-    """Coordinate NIU API updates for all entities in a config entry."""
+class NiuDataUpdateCoordinator(DataUpdateCoordinator[NiuSnapshot]):
+    """Coordinate NIU API updates for all entities in a config entry.
+
+    Each endpoint group has its own refresh interval. The coordinator ticks
+    when the next group falls due and only calls the endpoints that are due,
+    merging them into the existing snapshot.
+
+    Live groups (battery and status) adapt their configured interval to the
+    scooter state: they are polled every ``ACTIVE_POLL_INTERVAL`` while
+    riding or charging and slowed down while parked or offline. Totals and
+    the last track always use their configured interval, and ticks where no
+    endpoint returned fresh data back off exponentially up to
+    ``MAX_BACKOFF_INTERVAL``.
+
+    Entities register the snapshot fields they read as their listener
+    context, and after a refresh only entities whose fields changed are
+    told to write state.
+
+    With a ``store``, the payloads of the last good refresh are persisted so
+    the next start can restore them before the first network refresh.
+    """
 
     def __init__(
         self,
@@ -33,32 +83,278 @@ class NiuDataUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
         entry: ConfigEntry,
         api: NiuApi,
         metadata: NiuMetadata,
+        history: NiuRideHistory | None = None,
+        statistics: NiuStatistics | None = None,
+        store: Store | None = None,
     ) -> None:
+        self.intervals = get_update_intervals(entry.data.get(CONF_AUTH, {}))
         super().__init__(
             hass,
             _LOGGER,
             config_entry=entry,
             name=f"niu_{metadata.sn}",
-            update_interval=UPDATE_INTERVAL,
+            update_interval=min(self.intervals.values()),
         )
         self.api = api
         self.metadata = metadata
+        self.history = history
+        self.statistics = statistics
+        self._store = store
+        # Last successful fetch and last attempt of each endpoint group
+        self._last_refreshed: dict[str, float] = {}
+        self._last_attempted: dict[str, float] = {}
+        self._forced_groups: set[str] = set()
+        self._refresh_priority = PRIORITY_POLL
+        self.vehicle_state = VEHICLE_STATE_PARKED
+        self.consecutive_failures = 0
+        self.skipped_entity_writes = 0
+        self._changed_fields: set[str] | None = None
+        # Ignition state commanded but not yet confirmed by the status endpoint
+        self.pending_ignition: bool | None = None
+        self._ignition_task: asyncio.Task | None = None
+
+    @property
+    def last_refreshed(self) -> Mapping[str, float]:
+        """Return when each endpoint group last returned fresh data (monotonic)."""
+        return MappingProxyType(self._last_refreshed)
+
+    @property
+    def snapshot(self) -> NiuSnapshot:
+        """Return the latest parsed snapshot, empty before the first refresh."""
+        return self.data or EMPTY_SNAPSHOT
 
-    async def _async_update_data(self) -> dict[str, Any]:
-        """Fetch a full snapshot while preserving last good values."""
-        snapshot = await self.hass.async_add_executor_job(self.api.refresh_all_data)
+    def _vehicle_state(self) -> str:
+        """Classify the scooter from the latest snapshot."""
+        snapshot = self.api.snapshot
+        if snapshot.moto_isConnected is not None and not snapshot.moto_isConnected:
+            return VEHICLE_STATE_OFFLINE
+        if snapshot.moto_isAccOn or snapshot.moto_isCharging:
+            return VEHICLE_STATE_ACTIVE
+        return VEHICLE_STATE_PARKED
+
+    def _effective_interval(self, group: str) -> timedelta:
+        """Return the interval of a group adapted to the scooter state."""
+        interval = self.intervals[group]
+        if group not in LIVE_UPDATE_GROUPS:
+            return interval
+        if self.vehicle_state == VEHICLE_STATE_ACTIVE:
+            return min(interval, ACTIVE_POLL_INTERVAL)
+        if self.vehicle_state == VEHICLE_STATE_OFFLINE:
+            return interval * OFFLINE_POLL_FACTOR
+        return interval * PARKED_POLL_FACTOR
+
+    def _due_groups(self, now: float) -> list[str]:
+        """Return the endpoint groups whose interval has elapsed."""
+        due = [
+            group
+            for group in UPDATE_GROUPS
+            if group in self._forced_groups
+            or group not in self._last_attempted
+            or now - self._last_attempted[group]
+            >= self._effective_interval(group).total_seconds() - SCHEDULE_TOLERANCE
+        ]
+        # A manual refresh with nothing due refreshes everything
+        return due or list(UPDATE_GROUPS)
+
+    def _schedule_next_tick(self, now: float) -> None:
+        """Point the next tick at the group that falls due first."""
+        next_due = min(
+            self._last_attempted.get(group, now)
+            + self._effective_interval(group).total_seconds()
+            for group in UPDATE_GROUPS
+        )
+        if self._forced_groups:
+            next_due = min(next_due, now + ACTIVE_POLL_INTERVAL.total_seconds())
+        self.update_interval = timedelta(
+            seconds=max(next_due - now, SCHEDULE_TOLERANCE)
+        )
+
+    def _schedule_backoff(self) -> None:
+        """Back off exponentially after consecutive failed refreshes."""
+        base = min(self._effective_interval(group) for group in UPDATE_GROUPS)
+        self.update_interval = min(
+            base * 2 ** min(self.consecutive_failures, 16), MAX_BACKOFF_INTERVAL
+        )
+
+    def _update_vehicle_state(self) -> None:
+        """Track the scooter state and catch up on ride data after a ride."""
+        previous_state = self.vehicle_state
+        self.vehicle_state = self._vehicle_state()
+        if (
+            previous_state == VEHICLE_STATE_ACTIVE
+            and self.vehicle_state != VEHICLE_STATE_ACTIVE
+        ):
+            # A ride or charge just ended, so totals and the last track changed
+            self._forced_groups.update((SENSOR_TYPE_TRACK, SENSOR_TYPE_OVERALL))
+
+        if previous_state != self.vehicle_state:
+            _LOGGER.debug(
+                "NIU scooter %s is now %s", self.metadata.sn, self.vehicle_state
+            )
+
+    async def async_refresh_groups(self, *groups: str) -> None:
+        """Refresh the given endpoint groups regardless of their schedule.
+
+        Someone is waiting for the result, so the requests are sent ahead of
+        background polling.
+        """
+        self._forced_groups.update(groups)
+        self._refresh_priority = PRIORITY_INTERACTIVE
+        await self.async_refresh()
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Notify only the entities whose snapshot fields changed."""
+        changed = self._changed_fields
+        self._changed_fields = None
+        if changed is None or not self.last_update_success:
+            super().async_update_listeners()
+            return
+
+        skipped = 0
+        for update_callback, context in list(self._listeners.values()):
+            if context is None or not changed.isdisjoint(context):
+                update_callback()
+            else:
+                skipped += 1
+
+        self.skipped_entity_writes += skipped
+        _LOGGER.debug(
+            "NIU scooter %s: %s fields changed, skipped %s entity writes (%s total)",
+            self.metadata.sn,
+            len(changed),
+            skipped,
+            self.skipped_entity_writes,
+        )
+
+    async def _async_update_data(self) -> NiuSnapshot:
+        """Fetch the due endpoints while preserving last good values."""
+        self._changed_fields = None
+        was_available = self.last_update_success and self.data is not None
+        now = time.monotonic()
+        due = self._due_groups(now)
+        self._forced_groups.clear()
+        priority = self._refresh_priority
+        self._refresh_priority = PRIORITY_POLL
+        if self.history is not None:
+            # Period totals move with the clock, so recompute them every tick
+            self.api.dataHistory = self.history.aggregates()
+        snapshot = await self.api.async_refresh_all_data(
+            groups=due, priority=priority
+        )
 
         if self.api.has_unsaved_token():
             await self.api.async_save_token()
 
-        if snapshot is None:
-            raise UpdateFailed("Unable to refresh NIU data")
+        refreshed = self.api.refreshed_groups
+        if snapshot is None or not refreshed:
+            self.consecutive_failures += 1
+            self._schedule_backoff()
+            if snapshot is None or self.data is None:
+                raise UpdateFailed("Unable to refresh NIU data")
+            # Entities keep the last good values while the cloud is down
+            _LOGGER.debug(
+                "NIU scooter %s: no endpoint answered (%s consecutive failures)",
+                self.metadata.sn,
+                self.consecutive_failures,
+            )
+            self._changed_fields = set()
+            return self.data
 
+        self.consecutive_failures = 0
+        if was_available:
+            self._changed_fields = snapshot.changed_fields(self.data)
+        for group in due:
+            # Failed groups are retried on their schedule, not every tick
+            self._last_attempted[group] = now
+        for group in refreshed:
+            self._last_refreshed[group] = now
+        self._update_vehicle_state()
+        self._schedule_next_tick(now)
+        self._sync_history(snapshot)
+        self._import_statistics(snapshot)
+        if self._store is not None:
+            self._store.async_delay_save(self.api.payloads, SNAPSHOT_SAVE_DELAY)
         return snapshot
 
+    def _sync_history(self, snapshot: NiuSnapshot) -> None:
+        """Pull new rides into the local history when the last track changes."""
+        if self.history is None or snapshot.track_trackId is None:
+            return
+        if (
+            str(snapshot.track_trackId) == self.history.newest_track_id
+            and self.history.backfill_complete
+        ):
+            if SENSOR_TYPE_TRACK in self.api.refreshed_groups:
+                # The track list has nothing newer than the local history
+                self.history.mark_synced()
+            return
+
+        self.config_entry.async_create_background_task(
+            self.hass,
+            self._async_sync_history(),
+            f"niu_ride_history_{self.metadata.sn}",
+        )
+
+    def _import_statistics(self, snapshot: NiuSnapshot | None = None) -> None:
+        """Buffer a refresh and import completed hours in the background.
+
+        Statistics are a side feature, so an error here is logged instead of
+        failing the refresh that called it.
+        """
+        if self.statistics is None:
+            return
+        try:
+            if snapshot is not None:
+                self.statistics.async_add_snapshot(snapshot)
+            if not self.statistics.has_pending():
+                return
+        except Exception:
+            _LOGGER.exception(
+                "Unable to buffer NIU statistics for %s", self.metadata.sn
+            )
+            return
+
+        self.config_entry.async_create_background_task(
+            self.hass,
+            self.statistics.async_flush(),
+            f"niu_statistics_{self.metadata.sn}",
+        )
+
+    async def _async_sync_history(self) -> None:
+        if not await self.history.async_sync():
+            return
+
+        self._import_statistics()
+
+        self.api.dataHistory = self.history.aggregates()
+        self._async_publish(self.api.build_snapshot())
+
+    @callback
+    def _async_publish(self, snapshot: NiuSnapshot) -> None:
+        """Publish a snapshot built outside of a scheduled refresh.
+
+        The next tick stays where the schedule puts it, and a failed or
+        backed-off poll is not reported as a success.
+        """
+        if self.data is not None:
+            self._changed_fields = snapshot.changed_fields(self.data)
+        if self.consecutive_failures or not self.last_update_success:
+            self.data = snapshot
+            self.async_update_listeners()
+            return
+
+        self._schedule_next_tick(time.monotonic())
+        self.async_set_updated_data(snapshot)
+
     async def async_set_ignition(self, ignition: bool) -> bool:
-        """Set ignition state and refresh the shared snapshot."""
-        result = await self.hass.async_add_executor_job(self.api.setIgnition, ignition)
+        """Send an ignition command and confirm it in the background.
+
+        The commanded state is shown optimistically through
+        ``pending_ignition`` while only the status endpoint is polled until
+        it reports the new state or ``IGNITION_CONFIRM_TIMEOUT`` passes.
+        """
+        result = await self.api.async_set_ignition(ignition)
 
         if self.api.has_unsaved_token():
             await self.api.async_save_token()
@@ -66,5 +362,70 @@ class NiuDataUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
         if not result:
             return False
 
-        await self.async_refresh()
+        if self._ignition_task is not None:
+            self._ignition_task.cancel()
+        self.pending_ignition = ignition
+        self._notify_ignition()
+        self._ignition_task = self.config_entry.async_create_background_task(
+            self.hass,
+            self._async_confirm_ignition(ignition),
+            f"niu_ignition_{self.metadata.sn}",
+        )
+        return True
+
+    def _notify_ignition(self) -> None:
+        """Tell only the entities reading the ignition state to write state."""
+        self._changed_fields = {"moto_isAccOn"}
+        self.async_update_listeners()
+
+    def _ignition_matches(self, ignition: bool) -> bool:
+        state = self.api.snapshot.moto_isAccOn
+        return state is not None and bool(state) == ignition
+
+    async def _async_confirm_ignition(self, ignition: bool) -> None:
+        deadline = time.monotonic() + IGNITION_CONFIRM_TIMEOUT
+        confirmed = False
+        try:
+            for delay in IGNITION_POLL_DELAYS:
+                if time.monotonic() + delay > deadline:
+                    break
+                await asyncio.sleep(delay)
+                if await self._async_refresh_status() and self._ignition_matches(
+                    ignition
+                ):
+                    confirmed = True
+                    break
+        finally:
+            if self._ignition_task is asyncio.current_task():
+                self._ignition_task = None
+
+        if not confirmed:
+            _LOGGER.warning(
+                "NIU scooter %s did not confirm ignition %s in time",
+                self.metadata.sn,
+                "on" if ignition else "off",
+            )
+        # Reconcile with whatever the scooter last reported
+        self.pending_ignition = None
+        self._notify_ignition()
+
+    async def _async_refresh_status(self) -> bool:
+        """Refresh only the status endpoint and publish the merged snapshot.
+
+        Returns False, leaving the schedule alone, when the endpoint did not
+        return fresh data; the kept payload may predate the command.
+        """
+        now = time.monotonic()
+        snapshot = await self.api.async_refresh_all_data(
+            groups=[SENSOR_TYPE_MOTO], priority=PRIORITY_INTERACTIVE
+        )
+        if self.api.has_unsaved_token():
+            await self.api.async_save_token()
+        if snapshot is None or SENSOR_TYPE_MOTO not in self.api.refreshed_groups:
+            return False
+
+        self._last_attempted[SENSOR_TYPE_MOTO] = now
+        self._last_refreshed[SENSOR_TYPE_MOTO] = now
+        self._update_vehicle_state()
+        self._async_publish(snapshot)
         return True
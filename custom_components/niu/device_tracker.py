@@ -0,0 +1,125 @@
+"""Device tracker platform for the NIU integration."""
+
+from __future__ import annotations
+
+import logging
+
+from homeassistant.components.device_tracker import SourceType, TrackerEntity
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util.location import distance
+
+from .const import (
+    CONF_AUTH,
+    DATA_COORDINATOR,
+    DOMAIN,
+    GPS_MIN_ACCURACY,
+    GPS_UERE_METERS,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
+) -> None:
+    """Set up the NIU scooter tracker from a config entry."""
+    if entry.data.get(CONF_AUTH) is None:
+        _LOGGER.error("No authentication data found for NIU device tracker")
+        return
+
+    coordinator = hass.data[DOMAIN][entry.entry_id][DATA_COORDINATOR]
+    async_add_entities([NiuDeviceTracker(coordinator)])
+
+
+class NiuDeviceTracker(CoordinatorEntity, TrackerEntity):
+    """GPS position of a NIU scooter.
+
+    A new fix is only written when it lies outside the accuracy radius of
+    the current one, so GPS jitter of a parked scooter does not reach the
+    state machine or the recorder.
+    """
+
+    def __init__(self, coordinator) -> None:
+        super().__init__(
+            coordinator,
+            context=frozenset({"position_lat", "position_lng", "moto_hdop"}),
+        )
+        self._attr_unique_id = (
+            f"device_tracker.niu_scooter_{coordinator.metadata.sn}_location"
+        )
+        self._attr_name = f"NIU e-Scooter {coordinator.metadata.sensor_prefix} Location"
+        self._attr_icon = "mdi:scooter-electric"
+        self._latitude: float | None = None
+        self._longitude: float | None = None
+        self._accuracy = 0
+        self.suppressed_updates = 0
+
+    @property
+    def available(self) -> bool:
+        """Return entity availability based on coordinator state."""
+        return self.coordinator.last_update_success or self._latitude is not None
+
+    @property
+    def source_type(self) -> SourceType:
+        return SourceType.GPS
+
+    @property
+    def latitude(self) -> float | None:
+        return self._latitude
+
+    @property
+    def longitude(self) -> float | None:
+        return self._longitude
+
+    @property
+    def location_accuracy(self) -> int:
+        return self._accuracy
+
+    @property
+    def device_info(self):
+        """Return device info for the scooter."""
+        return {
+            "identifiers": {(DOMAIN, self.coordinator.metadata.sn)},
+            "name": self.coordinator.metadata.sensor_prefix,
+            "manufacturer": "NIU",
+            "model": "Electric Scooter",
+            "sw_version": "1.0",
+        }
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self._update_position()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        if self._update_position() or not self.coordinator.last_update_success:
+            self.async_write_ha_state()
+
+    def _update_position(self) -> bool:
+        """Adopt the latest fix if it moved beyond the accuracy radius."""
+        snapshot = self.coordinator.snapshot
+        try:
+            latitude = float(snapshot.position_lat)
+            longitude = float(snapshot.position_lng)
+        except (TypeError, ValueError):
+            return False
+
+        try:
+            accuracy = float(snapshot.moto_hdop) * GPS_UERE_METERS
+        except (TypeError, ValueError):
+            accuracy = 0
+        accuracy = int(max(accuracy, GPS_MIN_ACCURACY))
+
+        if self._latitude is not None:
+            moved = distance(self._latitude, self._longitude, latitude, longitude)
+            if moved is not None and moved <= max(self._accuracy, accuracy):
+                self.suppressed_updates += 1
+                return False
+
+        self._latitude = latitude
+        self._longitude = longitude
+        self._accuracy = accuracy
+        return True
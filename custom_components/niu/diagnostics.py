@@ -0,0 +1,89 @@
+"""Diagnostics support for the NIU integration."""
+
+from __future__ import annotations
+
+import time
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    CONF_PASSWORD,
+    CONF_TOKEN_DATA,
+    CONF_USERNAME,
+    DATA_API,
+    DATA_COORDINATOR,
+    DATA_HISTORY,
+    DOMAIN,
+)
+
+TO_REDACT = {
+    CONF_USERNAME,
+    CONF_PASSWORD,
+    CONF_TOKEN_DATA,
+    "sn",
+    "bat_bmsId",
+    "position_lat",
+    "position_lng",
+}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    api = entry_data[DATA_API]
+    coordinator = entry_data[DATA_COORDINATOR]
+    history = entry_data[DATA_HISTORY]
+    session = api.session
+    now = time.monotonic()
+
+    return async_redact_data(
+        {
+            "entry": entry.data,
+            "coordinator": {
+                "sn": coordinator.metadata.sn,
+                "last_update_success": coordinator.last_update_success,
+                "update_interval_s": coordinator.update_interval.total_seconds()
+                if coordinator.update_interval
+                else None,
+                "vehicle_state": coordinator.vehicle_state,
+                "consecutive_failures": coordinator.consecutive_failures,
+                "skipped_entity_writes": coordinator.skipped_entity_writes,
+                "group_intervals_s": {
+                    group: interval.total_seconds()
+                    for group, interval in coordinator.intervals.items()
+                },
+                "group_refreshed_s_ago": {
+                    group: round(now - refreshed, 1)
+                    for group, refreshed in coordinator.last_refreshed.items()
+                },
+            },
+            "session": {
+                "entries": session.refcount,
+                "token_valid": session.is_token_valid(),
+                "token_expires_in_s": round(session.token_expires_at - time.time())
+                if session.token_expires_at
+                else None,
+                "vehicles": len(session.vehicles or ()),
+                "vehicles_age_s": round(time.time() - session.vehicles_fetched_at)
+                if session.vehicles_fetched_at
+                else None,
+                "cached_api_handles": len(session.api_cache),
+            },
+            "metrics": session.metrics.as_dict(),
+            "scheduler": session.scheduler.as_dict(),
+            "circuit_breakers": {
+                name: breaker.as_dict() for name, breaker in session.breakers.items()
+            },
+            "history": {
+                "rides": len(history.columns),
+                "backfill_complete": history.backfill_complete,
+            },
+            "snapshot": coordinator.snapshot.as_dict(),
+        },
+        TO_REDACT,
+    )
@@ -0,0 +1,49 @@
+"""Bounded executor for blocking work of the NIU integration."""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import Event, HomeAssistant, callback
+
+from .const import DATA_EXECUTOR, DOMAIN, EXECUTOR_WORKERS
+
+_T = TypeVar("_T")
+
+
+@callback
+def _async_get_executor(hass: HomeAssistant) -> ThreadPoolExecutor:
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    executor = domain_data.get(DATA_EXECUTOR)
+    if executor is None:
+        executor = domain_data[DATA_EXECUTOR] = ThreadPoolExecutor(
+            max_workers=EXECUTOR_WORKERS, thread_name_prefix="niu"
+        )
+
+        @callback
+        def _async_shutdown(_event: Event) -> None:
+            async_shutdown_executor(hass)
+
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _async_shutdown)
+    return executor
+
+
+async def async_run_blocking(
+    hass: HomeAssistant, target: Callable[..., _T], *args: Any
+) -> _T:
+    """Run blocking NIU work without taking Home Assistant's shared threads.
+
+    At most ``EXECUTOR_WORKERS`` jobs run at once, however many scooters
+    are configured. Cancelling the caller drops a job that has not started.
+    """
+    return await hass.loop.run_in_executor(_async_get_executor(hass), target, *args)
+
+
+@callback
+def async_shutdown_executor(hass: HomeAssistant) -> None:
+    """Stop the executor, dropping jobs that have not started."""
+    executor = hass.data.get(DOMAIN, {}).pop(DATA_EXECUTOR, None)
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,303 @@
+"""Local ride history synced from the NIU track list."""
+
+from __future__ import annotations
+
+from array import array
+import asyncio
+from bisect import bisect_left
+from contextlib import aclosing
+from datetime import datetime, timedelta
+import logging
+import os
+import struct
+import sys
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import STORAGE_DIR
+from homeassistant.util import dt as dt_util
+
+from .api import NiuApi, NiuApiError
+from .const import DOMAIN, TRACK_PAGE_SIZE
+from .executor import async_run_blocking
+
+_LOGGER = logging.getLogger(__name__)
+
+FILE_MAGIC = b"NIUR"
+FILE_VERSION = 1
+FLAG_BACKFILL_COMPLETE = 1
+# magic, version, flags, ride count; all sections are little-endian
+HEADER = struct.Struct("<4sHHI")
+IDS_LENGTH = struct.Struct("<I")
+
+# Column name, array typecode and the track-list field it is taken from
+COLUMNS = (
+    ("start", "q", "startTime"),
+    ("end", "q", "endTime"),
+    ("distance", "d", "distance"),
+    ("avespeed", "d", "avespeed"),
+    ("ridingtime", "q", "ridingtime"),
+)
+
+AGGREGATE_PERIODS = ("week", "month", "year")
+
+
+def _number(value, typecode):
+    try:
+        return int(value) if typecode == "q" else float(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+class RideColumns:
+    """Ride history stored as one typed array per field, sorted by start time.
+
+    The on-disk layout is a fixed header followed by each column's raw
+    array and finally the newline-separated track ids, so loading it is one
+    read and a copy per column instead of parsing JSON.
+    """
+
+    __slots__ = ("start", "end", "distance", "avespeed", "ridingtime", "track_ids")
+
+    def __init__(self) -> None:
+        for name, typecode, _ in COLUMNS:
+            setattr(self, name, array(typecode))
+        self.track_ids: list[str] = []
+
+    def __len__(self) -> int:
+        return len(self.track_ids)
+
+    def add(self, rides) -> int:
+        """Add track-list items, keeping the columns sorted by start time."""
+        added = 0
+        needs_sort = False
+        for item in rides:
+            start = item.get("startTime")
+            if start is None or not item.get("trackId"):
+                continue
+            start = _number(start, "q")
+            if self.start and start < self.start[-1]:
+                needs_sort = True
+            for name, typecode, field in COLUMNS:
+                getattr(self, name).append(_number(item.get(field), typecode))
+            self.track_ids.append(str(item["trackId"]))
+            added += 1
+
+        if needs_sort:
+            self._sort()
+        return added
+
+    def _sort(self) -> None:
+        order = sorted(range(len(self.start)), key=self.start.__getitem__)
+        for name, typecode, _ in COLUMNS:
+            column = getattr(self, name)
+            setattr(self, name, array(typecode, (column[i] for i in order)))
+        self.track_ids = [self.track_ids[i] for i in order]
+
+    def sum_since(self, column: str, start_ms: int) -> float:
+        """Sum a column over every ride starting at or after ``start_ms``."""
+        index = bisect_left(self.start, start_ms)
+        return sum(getattr(self, column)[index:])
+
+    def to_bytes(self, flags: int) -> bytes:
+        parts = [HEADER.pack(FILE_MAGIC, FILE_VERSION, flags, len(self))]
+        for name, _, _ in COLUMNS:
+            column = getattr(self, name)
+            if sys.byteorder != "little":
+                column = array(column.typecode, column)
+                column.byteswap()
+            parts.append(column.tobytes())
+        ids = "\n".join(self.track_ids).encode("utf-8")
+        parts.append(IDS_LENGTH.pack(len(ids)))
+        parts.append(ids)
+        return b"".join(parts)
+
+    @classmethod
+    def from_file(cls, path) -> tuple[RideColumns, int]:
+        """Read a history file into memory."""
+        columns = cls()
+        with open(path, "rb") as file:
+            data = memoryview(file.read())
+
+        magic, version, flags, count = HEADER.unpack_from(data, 0)
+        if magic != FILE_MAGIC or version != FILE_VERSION:
+            raise ValueError(f"Unsupported ride history file {path}")
+
+        offset = HEADER.size
+        for name, _, _ in COLUMNS:
+            column = getattr(columns, name)
+            size = count * column.itemsize
+            column.frombytes(data[offset : offset + size])
+            if sys.byteorder != "little":
+                column.byteswap()
+            offset += size
+
+        (ids_length,) = IDS_LENGTH.unpack_from(data, offset)
+        offset += IDS_LENGTH.size
+        ids = bytes(data[offset : offset + ids_length]).decode("utf-8")
+        columns.track_ids = ids.split("\n") if ids else []
+        return columns, flags
+
+
+def history_path(hass: HomeAssistant, sn: str) -> str:
+    """Return the path of the ride history file of scooter ``sn``."""
+    return hass.config.path(STORAGE_DIR, f"{DOMAIN}.rides.{sn}.bin")
+
+
+def _remove_files(*paths):
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+async def async_remove_history(hass: HomeAssistant, sn: str) -> None:
+    """Delete the ride history file of scooter ``sn`` and any partial write."""
+    path = history_path(hass, sn)
+    await async_run_blocking(hass, _remove_files, path, f"{path}.tmp")
+
+
+def _write_file(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(data)
+    os.replace(tmp_path, path)
+
+
+class NiuRideHistory:
+    """Full ride history of one scooter, kept in a columnar binary file.
+
+    The first sync backfills every page of the track list. Later syncs walk
+    the list from the newest ride and stop at the newest ride already known,
+    so they usually cost a single request. An interrupted backfill resumes
+    from where it stopped.
+    """
+
+    def __init__(self, hass: HomeAssistant, api: NiuApi) -> None:
+        self.hass = hass
+        self.api = api
+        self.columns = RideColumns()
+        self.backfill_complete = False
+        # Rides that ended before this moment are known to be in the history
+        self.synced_at: datetime | None = None
+        self._path = history_path(hass, api.sn)
+        self._sync_lock = asyncio.Lock()
+
+    @property
+    def newest_track_id(self) -> str | None:
+        return self.columns.track_ids[-1] if self.columns.track_ids else None
+
+    async def async_load(self) -> None:
+        if await async_run_blocking(self.hass, os.path.exists, self._path):
+            try:
+                self.columns, flags = await async_run_blocking(
+                    self.hass, RideColumns.from_file, self._path
+                )
+            except (OSError, ValueError, struct.error) as err:
+                _LOGGER.warning("Discarding unreadable NIU ride history: %s", err)
+                return
+            self.backfill_complete = bool(flags & FLAG_BACKFILL_COMPLETE)
+
+    async def _async_save(self) -> None:
+        flags = FLAG_BACKFILL_COMPLETE if self.backfill_complete else 0
+        await async_run_blocking(
+            self.hass, _write_file, self._path, self.columns.to_bytes(flags)
+        )
+
+    def aggregates(self, now=None) -> dict[str, float]:
+        """Return distance (km) and riding time (h) for the current periods."""
+        today = dt_util.start_of_local_day(now)
+        period_starts = {
+            "week": today - timedelta(days=today.weekday()),
+            "month": today.replace(day=1),
+            "year": today.replace(month=1, day=1),
+        }
+        totals = {}
+        for period in AGGREGATE_PERIODS:
+            start_ms = int(period_starts[period].timestamp() * 1000)
+            totals[f"{period}_distance"] = round(
+                self.columns.sum_since("distance", start_ms) / 1000, 2
+            )
+            totals[f"{period}_riding_time"] = round(
+                self.columns.sum_since("ridingtime", start_ms) / 3600, 2
+            )
+        return totals
+
+    async def async_sync(self) -> int:
+        """Fetch rides missing from the local history; return how many were added."""
+        if self._sync_lock.locked():
+            return 0
+
+        async with self._sync_lock:
+            started = dt_util.utcnow()
+            try:
+                added = await self._async_sync_newest()
+                if not self.backfill_complete:
+                    added += await self._async_backfill()
+            except NiuApiError as err:
+                _LOGGER.warning("NIU ride history sync stopped: %s", err)
+                return 0
+            self.mark_synced(started)
+
+        if added:
+            _LOGGER.debug("Added %s rides to NIU ride history", added)
+        return added
+
+    def mark_synced(self, moment: datetime | None = None) -> None:
+        """Record that every ride listed at ``moment`` is in the history."""
+        moment = moment or dt_util.utcnow()
+        if self.backfill_complete and (
+            self.synced_at is None or moment > self.synced_at
+        ):
+            self.synced_at = moment
+
+    async def _async_sync_newest(self) -> int:
+        """Add rides newer than the newest known one."""
+        newest = self.newest_track_id
+        if newest is None:
+            return 0
+
+        known = set(self.columns.track_ids)
+        new_rides = []
+        async with aclosing(
+            self.api.async_iter_track_pages(page_size=TRACK_PAGE_SIZE)
+        ) as pages:
+            async for page in pages:
+                for item in page:
+                    if not isinstance(item, dict):
+                        continue
+                    track_id = str(item.get("trackId"))
+                    if track_id == newest:
+                        break
+                    if track_id not in known:
+                        new_rides.append(item)
+                else:
+                    continue
+                break
+
+        added = self.columns.add(new_rides)
+        if added:
+            await self._async_save()
+        return added
+
+    async def _async_backfill(self) -> int:
+        """Add older rides page by page, saving after every page."""
+        known = set(self.columns.track_ids)
+        added = 0
+        start_page = len(self.columns) // TRACK_PAGE_SIZE
+        async for page in self.api.async_iter_track_pages(
+            start_page=start_page, page_size=TRACK_PAGE_SIZE
+        ):
+            new_rides = [
+                item
+                for item in page
+                if isinstance(item, dict) and str(item.get("trackId")) not in known
+            ]
+            known.update(str(item.get("trackId")) for item in new_rides)
+            added += self.columns.add(new_rides)
+            await self._async_save()
+
+        self.backfill_complete = True
+        await self._async_save()
+        return added
@@ -0,0 +1,116 @@
+"""Request metrics of a NIU account session."""
+
+from __future__ import annotations
+
+from collections import Counter, deque
+from typing import Any
+
+from .const import (
+    ACCOUNT_BASE_URL,
+    API_BASE_URL,
+    IGNITION_URI,
+    LOGIN_URI,
+    METRICS_LATENCY_WINDOW,
+    MOTOINFO_ALL_API_URI,
+    MOTOINFO_LIST_API_URI,
+    MOTOR_BATTERY_API_URI,
+    MOTOR_INDEX_API_URI,
+    TRACK_LIST_API_URI,
+)
+
+ENDPOINT_NAMES = {
+    ACCOUNT_BASE_URL + LOGIN_URI: "login",
+    API_BASE_URL + MOTOINFO_LIST_API_URI: "vehicles",
+    API_BASE_URL + MOTOR_BATTERY_API_URI: "battery",
+    API_BASE_URL + MOTOR_INDEX_API_URI: "status",
+    API_BASE_URL + MOTOINFO_ALL_API_URI: "totals",
+    API_BASE_URL + TRACK_LIST_API_URI: "tracks",
+    API_BASE_URL + IGNITION_URI: "ignition",
+}
+
+
+def endpoint_name(url: str) -> str:
+    name = ENDPOINT_NAMES.get(url)
+    if name is not None:
+        return name
+    if "/thumb/" in url:
+        # Every ride has its own thumbnail URL
+        return "thumbnail"
+    return url.partition("?")[0]
+
+
+class EndpointMetrics:
+    """Counters and recent latencies of one endpoint.
+
+    Recording is a few counter increments and a bounded deque append;
+    percentiles are only computed when the metrics are read.
+    """
+
+    __slots__ = ("requests", "failures", "response_bytes", "latencies")
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.failures: Counter[str] = Counter()
+        self.response_bytes = 0
+        self.latencies: deque[float] = deque(maxlen=METRICS_LATENCY_WINDOW)
+
+    def percentile(self, fraction: float) -> float | None:
+        """Return a latency percentile in seconds over the recent window."""
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+    def as_dict(self) -> dict[str, Any]:
+        p50 = self.percentile(0.5)
+        p95 = self.percentile(0.95)
+        return {
+            "requests": self.requests,
+            "failures": dict(self.failures),
+            "response_bytes": self.response_bytes,
+            "latency_p50_ms": None if p50 is None else round(p50 * 1000, 1),
+            "latency_p95_ms": None if p95 is None else round(p95 * 1000, 1),
+        }
+
+
+class NiuRequestMetrics:
+    """Per-endpoint request metrics and token refreshes of one account."""
+
+    def __init__(self) -> None:
+        self.endpoints: dict[str, EndpointMetrics] = {}
+        self.token_refreshes = 0
+
+    def record(
+        self, url: str, latency: float, failure: str | None = None, size: int = 0
+    ) -> None:
+        """Record one finished request; ``failure`` is None on success."""
+        name = endpoint_name(url)
+        endpoint = self.endpoints.get(name)
+        if endpoint is None:
+            endpoint = self.endpoints[name] = EndpointMetrics()
+        endpoint.requests += 1
+        endpoint.response_bytes += size
+        endpoint.latencies.append(latency)
+        if failure is not None:
+            endpoint.failures[failure] += 1
+
+    def endpoint(self, name: str) -> EndpointMetrics | None:
+        return self.endpoints.get(name)
+
+    @property
+    def total_requests(self) -> int:
+        return sum(endpoint.requests for endpoint in self.endpoints.values())
+
+    @property
+    def total_failures(self) -> int:
+        return sum(
+            sum(endpoint.failures.values()) for endpoint in self.endpoints.values()
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "token_refreshes": self.token_refreshes,
+            "endpoints": {
+                name: endpoint.as_dict() for name, endpoint in self.endpoints.items()
+            },
+        }
@@ -0,0 +1,115 @@
+"""Retry backoff and per-endpoint circuit breaking for NIU requests."""
+
+from __future__ import annotations
+
+import logging
+import random
+import time
+from typing import Any
+
+from .const import (
+    BREAKER_COOLDOWN,
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_MAX_COOLDOWN,
+    RETRY_BACKOFF_BASE,
+    RETRY_BACKOFF_MAX,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+def retry_delay(attempt: int) -> float:
+    """Return the full-jitter backoff before retry number ``attempt + 1``."""
+    return random.uniform(0, min(RETRY_BACKOFF_MAX, RETRY_BACKOFF_BASE * 2 ** attempt))
+
+
+class NiuCircuitBreaker:
+    """Stop calling an endpoint that keeps failing.
+
+    After ``BREAKER_FAILURE_THRESHOLD`` consecutive transient failures the
+    circuit opens and requests are rejected without touching the network.
+    Once the cooldown has passed a single probe is let through (half-open):
+    success closes the circuit, failure opens it again with twice the
+    cooldown, up to ``BREAKER_MAX_COOLDOWN``.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self.trips = 0
+        self.rejected = 0
+        self._opened_at = 0.0
+        self._cooldown = BREAKER_COOLDOWN
+        self._probing = False
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == STATE_OPEN
+
+    def allow_request(self) -> bool:
+        """Return whether a request may be sent now."""
+        if self.state == STATE_CLOSED:
+            return True
+
+        if self.state == STATE_OPEN:
+            if time.monotonic() - self._opened_at < self._cooldown:
+                self.rejected += 1
+                return False
+            self.state = STATE_HALF_OPEN
+            self._probing = False
+
+        if self._probing:
+            self.rejected += 1
+            return False
+        self._probing = True
+        return True
+
+    def record_success(self) -> None:
+        if self.state != STATE_CLOSED:
+            _LOGGER.info("NIU endpoint %s recovered", self.name)
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self._cooldown = BREAKER_COOLDOWN
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == STATE_HALF_OPEN:
+            self._cooldown = min(self._cooldown * 2, BREAKER_MAX_COOLDOWN)
+            self._open()
+        elif self.state == STATE_CLOSED and self.failures >= BREAKER_FAILURE_THRESHOLD:
+            self._open()
+
+    def release_probe(self) -> None:
+        """Let another probe through after one ended without an outcome."""
+        self._probing = False
+
+    def _open(self) -> None:
+        self.state = STATE_OPEN
+        self.trips += 1
+        self._opened_at = time.monotonic()
+        self._probing = False
+        _LOGGER.warning(
+            "NIU endpoint %s keeps failing, pausing it for %ss",
+            self.name,
+            self._cooldown,
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        retry_in = None
+        if self.state == STATE_OPEN:
+            retry_in = round(
+                max(self._cooldown - (time.monotonic() - self._opened_at), 0), 1
+            )
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "trips": self.trips,
+            "rejected": self.rejected,
+            "retry_in_s": retry_in,
+        }
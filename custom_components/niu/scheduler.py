@@ -0,0 +1,190 @@
+"""Account-wide pacing of NIU cloud requests."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+import heapq
+import itertools
+import logging
+import time
+from typing import Any
+
+from .const import (
+    MAX_QUEUE_WAIT,
+    METRICS_LATENCY_WINDOW,
+    PRIORITY_BACKGROUND,
+    PRIORITY_COMMAND,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_POLL,
+    REQUEST_BURST,
+    REQUEST_RATE,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+PRIORITY_NAMES = {
+    PRIORITY_COMMAND: "command",
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_POLL: "poll",
+    PRIORITY_BACKGROUND: "background",
+}
+
+# Shortest wait before the dispatcher looks at the bucket again
+MIN_DISPATCH_DELAY = 0.01
+
+
+class NiuQueueTimeout(Exception):
+    """Raised when a request would wait too long for a scheduler slot."""
+
+
+class NiuRequestScheduler:
+    """Token bucket with a priority queue, shared by one account's requests.
+
+    Requests take a token when one is available and nobody is queued;
+    otherwise they wait in priority order, so an ignition command overtakes
+    queued background polling. A rate-limit response pauses the whole
+    account until the server's ``Retry-After`` has passed. No request waits
+    longer than ``MAX_QUEUE_WAIT``; it fails right away when the pause
+    outlasts that. A scheduler with ``rate`` and ``burst`` set to
+    ``math.inf`` never delays a request.
+    """
+
+    def __init__(self, rate=REQUEST_RATE, burst=REQUEST_BURST) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.rate_limited = 0
+        self.rejected = 0
+        self.waits: dict[int, deque[float]] = {
+            priority: deque(maxlen=METRICS_LATENCY_WINDOW)
+            for priority in PRIORITY_NAMES
+        }
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._wakeup: asyncio.TimerHandle | None = None
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for *_, future in self._waiters if not future.done())
+
+    def _take(self, now: float) -> bool:
+        if now < self._paused_until:
+            return False
+
+        if now > self._updated:
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+        if self._tokens < 1:
+            return False
+
+        self._tokens -= 1
+        return True
+
+    async def async_acquire(
+        self, priority: int = PRIORITY_POLL, max_wait: float = MAX_QUEUE_WAIT
+    ) -> None:
+        """Wait until a request of ``priority`` may be sent.
+
+        Raises ``NiuQueueTimeout`` when no slot is granted within
+        ``max_wait`` seconds.
+        """
+        start = time.monotonic()
+        if self._paused_until - start > max_wait:
+            self.rejected += 1
+            raise NiuQueueTimeout("NIU requests are paused after a rate limit")
+        if not self._waiters and self._take(start):
+            self.waits[priority].append(0.0)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        self._dispatch()
+        try:
+            async with asyncio.timeout(max_wait):
+                await future
+        except (asyncio.CancelledError, TimeoutError) as err:
+            if future.done() and not future.cancelled():
+                # Granted just before the caller gave up; hand the token back
+                self._tokens = min(self.burst, self._tokens + 1)
+                self._dispatch()
+            else:
+                future.cancel()
+            if isinstance(err, TimeoutError):
+                self.rejected += 1
+                raise NiuQueueTimeout(
+                    f"No NIU request slot within {max_wait}s"
+                ) from None
+            raise
+
+        self.waits[priority].append(time.monotonic() - start)
+
+    def _dispatch(self) -> None:
+        """Grant tokens to queued requests and schedule the next check."""
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+            self._wakeup = None
+
+        now = time.monotonic()
+        while self._waiters:
+            if self._waiters[0][2].done():
+                heapq.heappop(self._waiters)
+                continue
+            if not self._take(now):
+                break
+            heapq.heappop(self._waiters)[2].set_result(None)
+
+        if self._waiters:
+            delay = max(
+                self._paused_until - now,
+                (1 - self._tokens) / self.rate,
+                MIN_DISPATCH_DELAY,
+            )
+            self._wakeup = asyncio.get_running_loop().call_later(delay, self._dispatch)
+
+    @property
+    def is_paused(self) -> bool:
+        return time.monotonic() < self._paused_until
+
+    def pause(self, delay: float) -> None:
+        """Hold every request of the account for ``delay`` seconds."""
+        self.rate_limited += 1
+        self._paused_until = max(self._paused_until, time.monotonic() + delay)
+        self._tokens = 0.0
+        # Refill from the end of the pause, not across it
+        self._updated = self._paused_until
+        _LOGGER.warning("NIU cloud rate limit hit, pausing requests for %ss", delay)
+
+    def close(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+            self._wakeup = None
+        for *_, future in self._waiters:
+            future.cancel()
+        self._waiters.clear()
+
+    def as_dict(self) -> dict[str, Any]:
+        waits = {}
+        for priority, samples in self.waits.items():
+            if not samples:
+                continue
+            ordered = sorted(samples)
+            waits[PRIORITY_NAMES[priority]] = {
+                "p50_ms": round(ordered[len(ordered) // 2] * 1000, 1),
+                "p95_ms": round(
+                    ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)] * 1000, 1
+                ),
+                "max_ms": round(ordered[-1] * 1000, 1),
+            }
+        return {
+            "queue_depth": self.queue_depth,
+            "tokens": round(self._tokens, 2),
+            "paused_for_s": round(max(self._paused_until - time.monotonic(), 0), 1),
+            "rate_limited": self.rate_limited,
+            "rejected": self.rejected,
+            "wait": waits,
+        }
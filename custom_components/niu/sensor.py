@@ -4,8 +4,9 @@ from __future__ import annotations
 
 import logging
 
-from homeassistant.components.sensor import SensorEntity
+from homeassistant.components.sensor import SensorEntity, SensorStateClass
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
@@ -16,18 +17,38 @@ from .const import (
     CONF_SENSORS,
     DATA_COORDINATOR,
     DOMAIN,
-    normalize_sensor_selections,
-    SENSOR_TYPE_BAT,
-    SENSOR_TYPE_DIST,
     SENSOR_TYPE_MOTO,
-    SENSOR_TYPE_OVERALL,
-    SENSOR_TYPE_POS,
-    SENSOR_TYPE_TRACK,
     SENSOR_TYPES,
+    normalize_sensor_selections,
 )
+from .snapshot import SENSOR_ACCESSORS, SENSOR_FIELD_KEYS
 
 _LOGGER = logging.getLogger(__name__)
 
+# Extra attributes of the scooter connectivity sensor and their snapshot fields
+CONNECTIVITY_ATTRIBUTES = {
+    "bmsId": "bat_bmsId",
+    "ignition": "moto_isAccOn",
+    "latitude": "position_lat",
+    "longitude": "position_lng",
+    "gsm": "moto_gsm",
+    "gps": "moto_gps",
+    "time": "dist_time",
+    "range": "moto_estimatedMileage",
+    "battery": "bat_batteryCharging",
+    "battery_grade": "bat_gradeBattery",
+    "centre_ctrl_batt": "moto_centreCtrlBattery",
+}
+ZERO_CHECKED_FIELDS = {"batteryCharging", "gradeBattery", "centreCtrlBattery"}
+
+# Endpoints that get a latency diagnostic sensor, by metrics endpoint name
+LATENCY_ENDPOINTS = {
+    "battery": "Battery",
+    "status": "Status",
+    "totals": "Totals",
+    "tracks": "Tracks",
+}
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -48,6 +69,16 @@ async def async_setup_entry(
         for sensor in sensors_selected
         if sensor != "LastTrackThumb" and sensor not in BIN_SENSOR_TYPES
     ]
+    devices.append(NiuApiMetricsSensor(coordinator, "api_requests", "API Requests"))
+    devices.append(
+        NiuApiMetricsSensor(coordinator, "api_token_refreshes", "API Token Refreshes")
+    )
+    devices.extend(
+        NiuApiMetricsSensor(
+            coordinator, f"api_latency_{endpoint}", f"API {label} Latency", endpoint
+        )
+        for endpoint, label in LATENCY_ENDPOINTS.items()
+    )
     async_add_entities(devices)
 
 
@@ -65,9 +96,16 @@ class NiuSensor(CoordinatorEntity, SensorEntity):
         device_class,
         icon,
     ) -> None:
-        super().__init__(coordinator)
+        # Snapshot fields that affect this entity's state or attributes
+        context = {SENSOR_FIELD_KEYS[name]}
+        if sensor_grp == SENSOR_TYPE_MOTO and id_name == "isConnected":
+            context.update(CONNECTIVITY_ATTRIBUTES.values())
+        if id_name in ZERO_CHECKED_FIELDS:
+            context.update(("has_data", "bat_bmsId", "moto_isConnected"))
+        super().__init__(coordinator, context=frozenset(context))
         self._sensor_grp = sensor_grp
         self._id_name = id_name
+        self._accessor = SENSOR_ACCESSORS[name]
         self._attr_unique_id = (
             f"sensor.niu_scooter_{self.coordinator.metadata.sn}_{sensor_id}"
         )
@@ -109,18 +147,10 @@ class NiuSensor(CoordinatorEntity, SensorEntity):
     def extra_state_attributes(self):
         """Return extra attributes for the connectivity sensor."""
         if self._sensor_grp == SENSOR_TYPE_MOTO and self._id_name == "isConnected":
+            snapshot = self.coordinator.snapshot
             attributes = {
-                "bmsId": self.coordinator.api.getDataBat("bmsId"),
-                "ignition": self.coordinator.api.getDataMoto("isAccOn"),
-                "latitude": self.coordinator.api.getDataPos("lat"),
-                "longitude": self.coordinator.api.getDataPos("lng"),
-                "gsm": self.coordinator.api.getDataMoto("gsm"),
-                "gps": self.coordinator.api.getDataMoto("gps"),
-                "time": self.coordinator.api.getDataDist("time"),
-                "range": self.coordinator.api.getDataMoto("estimatedMileage"),
-                "battery": self.coordinator.api.getDataBat("batteryCharging"),
-                "battery_grade": self.coordinator.api.getDataBat("gradeBattery"),
-                "centre_ctrl_batt": self.coordinator.api.getDataMoto("centreCtrlBattery"),
+                attribute: getattr(snapshot, key)
+                for attribute, key in CONNECTIVITY_ATTRIBUTES.items()
             }
             if any(value is not None for value in attributes.values()):
                 self._last_extra_attributes = attributes
@@ -128,31 +158,110 @@ class NiuSensor(CoordinatorEntity, SensorEntity):
         return self._last_extra_attributes
 
     def _get_value(self):
-        if self._sensor_grp == SENSOR_TYPE_BAT:
-            return self.coordinator.api.getDataBat(self._id_name)
-        if self._sensor_grp == SENSOR_TYPE_MOTO:
-            return self.coordinator.api.getDataMoto(self._id_name)
-        if self._sensor_grp == SENSOR_TYPE_POS:
-            return self.coordinator.api.getDataPos(self._id_name)
-        if self._sensor_grp == SENSOR_TYPE_DIST:
-            return self.coordinator.api.getDataDist(self._id_name)
-        if self._sensor_grp == SENSOR_TYPE_OVERALL:
-            return self.coordinator.api.getDataOverall(self._id_name)
-        if self._sensor_grp == SENSOR_TYPE_TRACK:
-            return self.coordinator.api.getDataTrack(self._id_name)
-        return None
+        return self._accessor(self.coordinator.snapshot)
 
     def _is_invalid_zero(self, value):
-        if self._id_name not in {"batteryCharging", "gradeBattery", "centreCtrlBattery"}:
+        if self._id_name not in ZERO_CHECKED_FIELDS:
             return False
 
         if value != 0:
             return False
 
-        if not self.coordinator.api.has_snapshot_data():
+        snapshot = self.coordinator.snapshot
+        if not snapshot.has_data:
             return True
 
         if self._id_name == "centreCtrlBattery":
-            return self.coordinator.api.getDataMoto("isConnected") is None
+            return snapshot.moto_isConnected is None
 
-        return self.coordinator.api.getDataBat("bmsId") is None
+        return snapshot.bat_bmsId is None
+
+
+class NiuApiMetricsSensor(CoordinatorEntity, SensorEntity):
+    """Diagnostic sensor exposing request metrics of the scooter's account.
+
+    Metrics are kept per NIU account, so scooters on the same account
+    report the same values.
+    """
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    # The attributes change on every request; only the state is worth recording
+    _unrecorded_attributes = frozenset(
+        {
+            "failures",
+            "queue_depth",
+            "rate_limited",
+            "queue_wait",
+            "requests",
+            "response_bytes",
+            "latency_p50_ms",
+        }
+    )
+
+    def __init__(self, coordinator, sensor_id, name, endpoint=None) -> None:
+        super().__init__(coordinator)
+        self._sensor_id = sensor_id
+        self._endpoint = endpoint
+        self._attr_unique_id = (
+            f"sensor.niu_scooter_{self.coordinator.metadata.sn}_{sensor_id}"
+        )
+        self._attr_name = (
+            f"NIU e-Scooter {self.coordinator.metadata.sensor_prefix} {name}"
+        )
+        if endpoint is None:
+            self._attr_state_class = SensorStateClass.TOTAL_INCREASING
+            self._attr_icon = "mdi:counter"
+        else:
+            self._attr_native_unit_of_measurement = "ms"
+            self._attr_state_class = SensorStateClass.MEASUREMENT
+            self._attr_icon = "mdi:timer-outline"
+            self._attr_entity_registry_enabled_default = False
+
+    @property
+    def _metrics(self):
+        return self.coordinator.api.session.metrics
+
+    @property
+    def native_value(self):
+        """Return the metric value."""
+        if self._sensor_id == "api_requests":
+            return self._metrics.total_requests
+        if self._sensor_id == "api_token_refreshes":
+            return self._metrics.token_refreshes
+
+        endpoint = self._metrics.endpoint(self._endpoint)
+        if endpoint is None:
+            return None
+        return endpoint.as_dict()["latency_p95_ms"]
+
+    @property
+    def extra_state_attributes(self):
+        """Return failure counts and, for latency sensors, endpoint details."""
+        if self._sensor_id == "api_requests":
+            scheduler = self.coordinator.api.session.scheduler.as_dict()
+            return {
+                "failures": self._metrics.total_failures,
+                "queue_depth": scheduler["queue_depth"],
+                "rate_limited": scheduler["rate_limited"],
+                "queue_wait": scheduler["wait"],
+            }
+        if self._endpoint is None:
+            return None
+
+        endpoint = self._metrics.endpoint(self._endpoint)
+        if endpoint is None:
+            return None
+        attributes = endpoint.as_dict()
+        attributes.pop("latency_p95_ms")
+        return attributes
+
+    @property
+    def device_info(self):
+        """Return device info for the scooter."""
+        return {
+            "identifiers": {(DOMAIN, self.coordinator.metadata.sn)},
+            "name": self.coordinator.metadata.sensor_prefix,
+            "manufacturer": "NIU",
+            "model": "Electric Scooter",
+            "sw_version": "1.0",
+        }
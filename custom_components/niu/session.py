@@ -0,0 +1,640 @@
+"""Account-level NIU cloud session shared by config entries."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Callable
+
+import httpx
+
+from homeassistant.core import CALLBACK_TYPE, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    ACCOUNT_BASE_URL,
+    API_BASE_URL,
+    API_CACHE_SIZE,
+    API_CACHE_TTL,
+    DATA_SESSIONS,
+    DEFAULT_REQUEST_TIMEOUT,
+    DOMAIN,
+    LOGIN_URI,
+    MAX_RATE_LIMIT_BACKOFF,
+    MOTOINFO_LIST_API_URI,
+    PRIORITY_BACKGROUND,
+    PRIORITY_COMMAND,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_POLL,
+    RATE_LIMIT_BACKOFF,
+    REQUEST_RETRIES,
+    REQUEST_TIMEOUTS,
+    VEHICLE_LIST_TTL,
+)
+from .metrics import NiuRequestMetrics, endpoint_name
+from .retry import NiuCircuitBreaker, retry_delay
+from .scheduler import NiuQueueTimeout, NiuRequestScheduler
+
+_LOGGER = logging.getLogger(__name__)
+
+TOKEN_EXPIRY_BUFFER = 300
+# Renew this many seconds before the token stops being considered valid
+TOKEN_RENEW_MARGIN = 600
+TOKEN_RENEW_RETRY = 300
+
+VEHICLES_STORAGE_VERSION = 1
+# Only these vehicle list fields are used, so only they are kept and compared
+VEHICLE_FIELDS = ("sn_id", "scooter_name")
+
+
+def _retry_after(response: httpx.Response) -> float:
+    """Return how long a rate-limited response asks clients to wait."""
+    value = response.headers.get("Retry-After")
+    delay = None
+    if value:
+        try:
+            delay = float(value)
+        except ValueError:
+            try:
+                delay = parsedate_to_datetime(value).timestamp() - time.time()
+            except (TypeError, ValueError):
+                delay = None
+    if delay is None:
+        delay = RATE_LIMIT_BACKOFF
+    return min(max(delay, 1), MAX_RATE_LIMIT_BACKOFF)
+
+
+_timeouts: dict[str, tuple[httpx.Timeout, float]] = {}
+
+
+def request_timeouts(name: str) -> tuple[httpx.Timeout, float]:
+    """Return the httpx timeout and the hard deadline of an endpoint."""
+    timeouts = _timeouts.get(name)
+    if timeouts is None:
+        connect, read = REQUEST_TIMEOUTS.get(name, DEFAULT_REQUEST_TIMEOUT)
+        timeouts = _timeouts[name] = (
+            httpx.Timeout(read, connect=connect),
+            connect + read,
+        )
+    return timeouts
+
+
+def _trim_vehicle(item):
+    if not isinstance(item, dict):
+        return None
+    return {field: item.get(field) for field in VEHICLE_FIELDS}
+
+
+class NiuApiCache:
+    """Bounded LRU of initialized per-scooter API handles with TTL eviction."""
+
+    def __init__(self, maxsize=API_CACHE_SIZE, ttl=API_CACHE_TTL) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl.total_seconds()
+        self._items: OrderedDict[Any, tuple[float, Any]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, key):
+        """Return a cached handle, evicting it if it has expired."""
+        item = self._items.get(key)
+        if item is None:
+            return None
+
+        created, value = item
+        if time.monotonic() - created >= self.ttl:
+            del self._items[key]
+            return None
+
+        self._items.move_to_end(key)
+        return value
+
+    def put(self, key, value) -> None:
+        """Cache a handle, evicting the least recently used one when full."""
+        self._items[key] = (time.monotonic(), value)
+        self._items.move_to_end(key)
+        while len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        self._items.clear()
+
+
+class NiuAccountSession:
+    """Login, HTTP connection and vehicle list of one NIU account.
+
+    Every config entry on the same account shares one session, so several
+    scooters cost a single login and a single vehicle-list download. Logins
+    are single-flight and, when running inside Home Assistant, the token is
+    renewed in the background before it expires.
+
+    Every request waits for a slot of the account's ``NiuRequestScheduler``,
+    and a 429 response pauses the account for its ``Retry-After``. Transient
+    failures are retried and each endpoint has its own circuit breaker.
+
+    Inside Home Assistant the vehicle list is also persisted. A stored list
+    is used right away and, once older than ``VEHICLE_LIST_TTL``, revalidated
+    in the background; vehicle listeners are told when it changed.
+    """
+
+    def __init__(
+        self,
+        username,
+        password,
+        hass=None,
+        client: httpx.AsyncClient | None = None,
+        scheduler: NiuRequestScheduler | None = None,
+    ) -> None:
+        self.username = username
+        self.password = password
+        self.hass = hass
+
+        self.token = None
+        self.token_expires_at = None
+        self.vehicles: list | None = None
+        self.vehicles_fetched_at: float | None = None
+        self.refcount = 0
+        self.api_cache = NiuApiCache()
+        self.metrics = NiuRequestMetrics()
+        self.scheduler = scheduler or NiuRequestScheduler()
+        self.breakers: dict[str, NiuCircuitBreaker] = {}
+
+        self._client = client
+        self._owns_client = False
+        self._vehicles_lock = asyncio.Lock()
+        self._login_task: asyncio.Task | None = None
+        self._renew_unsub: CALLBACK_TYPE | None = None
+        self._token_listeners: list[Callable[[], None]] = []
+        self._vehicle_listeners: list[Callable[[], None]] = []
+        self._vehicles_loaded = False
+        self._revalidate_task: asyncio.Task | None = None
+        self._vehicles_store: Store[dict] | None = None
+        if hass is not None:
+            self._vehicles_store = _vehicles_store(hass, username)
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Return the pooled HTTP client used for every NIU request."""
+        if self._client is None:
+            if self.hass is not None:
+                from homeassistant.helpers.httpx_client import get_async_client
+
+                self._client = get_async_client(self.hass)
+            else:
+                self._client = httpx.AsyncClient()
+                self._owns_client = True
+
+        return self._client
+
+    async def async_close(self):
+        """Stop token renewal and close the HTTP client if this session created it."""
+        if self._renew_unsub is not None:
+            self._renew_unsub()
+            self._renew_unsub = None
+        if self._login_task is not None:
+            self._login_task.cancel()
+            self._login_task = None
+        if self._revalidate_task is not None:
+            self._revalidate_task.cancel()
+            self._revalidate_task = None
+        self.scheduler.close()
+        self.api_cache.clear()
+        if self._owns_client and self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._owns_client = False
+
+    def adopt_token(self, token_data):
+        """Use a stored token if it outlives the one currently held."""
+        if not token_data or not token_data.get("access_token"):
+            return
+
+        expires_at = token_data.get("expires_at")
+        if self.token and (
+            not expires_at or expires_at <= (self.token_expires_at or 0)
+        ):
+            return
+
+        self.token = token_data["access_token"]
+        self.token_expires_at = expires_at
+        _LOGGER.debug("Loaded stored token")
+        self._schedule_renewal()
+
+    @callback
+    def async_add_token_listener(self, listener: Callable[[], None]) -> CALLBACK_TYPE:
+        """Call ``listener`` whenever a new token is obtained."""
+        self._token_listeners.append(listener)
+
+        @callback
+        def remove_listener() -> None:
+            self._token_listeners.remove(listener)
+
+        return remove_listener
+
+    @callback
+    def async_add_vehicles_listener(
+        self, listener: Callable[[], None]
+    ) -> CALLBACK_TYPE:
+        """Call ``listener`` whenever a downloaded vehicle list differs."""
+        self._vehicle_listeners.append(listener)
+
+        @callback
+        def remove_listener() -> None:
+            self._vehicle_listeners.remove(listener)
+
+        return remove_listener
+
+    def _schedule_renewal(self, delay=None):
+        """Renew the token in the background ahead of its expiry."""
+        if self.hass is None or not self.token_expires_at:
+            return
+
+        if self._renew_unsub is not None:
+            self._renew_unsub()
+        if delay is None:
+            delay = (
+                self.token_expires_at
+                - TOKEN_EXPIRY_BUFFER
+                - TOKEN_RENEW_MARGIN
+                - time.time()
+            )
+        self._renew_unsub = async_call_later(
+            self.hass, max(delay, 0), self._async_renew_token
+        )
+
+    async def _async_renew_token(self, _now) -> None:
+        self._renew_unsub = None
+        _LOGGER.debug("Renewing NIU token ahead of expiry")
+        if not await self.async_refresh_token():
+            self._schedule_renewal(TOKEN_RENEW_RETRY)
+
+    def is_token_valid(self):
+        """Check if the current token is valid and not expired."""
+        if not self.token or not self.token_expires_at:
+            return False
+
+        return time.time() < (self.token_expires_at - TOKEN_EXPIRY_BUFFER)
+
+    async def async_get_token(self):
+        url = ACCOUNT_BASE_URL + LOGIN_URI
+        md5 = hashlib.md5(self.password.encode("utf-8")).hexdigest()
+        data = {
+            "account": self.username,
+            "password": md5,
+            "grant_type": "password",
+            "scope": "base",
+            "app_id": "niu_ktdrr960",
+        }
+        timeout, deadline = request_timeouts("login")
+        try:
+            await self.scheduler.async_acquire(PRIORITY_COMMAND)
+        except NiuQueueTimeout as err:
+            _LOGGER.error("Error getting token: %s", err)
+            return False
+        start = time.monotonic()
+        try:
+            async with asyncio.timeout(deadline):
+                response = await self.client.post(url, data=data, timeout=timeout)
+        except (TimeoutError, httpx.TimeoutException):
+            self.metrics.record(url, time.monotonic() - start, "timeout")
+            _LOGGER.error("Timed out getting token")
+            return False
+        except httpx.HTTPError as err:
+            self.metrics.record(url, time.monotonic() - start, "transport")
+            _LOGGER.error("Error getting token: %s", err)
+            return False
+
+        self.metrics.record(
+            url,
+            time.monotonic() - start,
+            None if response.status_code == 200 else str(response.status_code),
+            len(response.content),
+        )
+        if response.status_code == 429:
+            self.scheduler.pause(_retry_after(response))
+        if response.status_code != 200:
+            _LOGGER.error(
+                "Token request failed with status code: %s", response.status_code
+            )
+            return False
+
+        try:
+            payload = json.loads(response.content.decode())
+            token_data = payload["data"]["token"]
+            access_token = token_data["access_token"]
+            expires_in = token_data.get("expires_in", 86400)
+            self.token_expires_at = time.time() + expires_in
+            _LOGGER.debug("Successfully obtained new token")
+            return access_token
+        except (KeyError, TypeError, json.JSONDecodeError) as err:
+            _LOGGER.error("Error parsing token response: %s", err)
+            return False
+
+    async def async_ensure_valid_token(self):
+        """Ensure we have a valid token, refresh if needed."""
+        if not self.is_token_valid():
+            _LOGGER.info("Token expired or invalid, refreshing...")
+            return await self.async_refresh_token()
+
+        return True
+
+    async def async_refresh_token(self):
+        """Log in once, however many callers need a new token at the same time."""
+        if self._login_task is None:
+            self._login_task = asyncio.ensure_future(self._async_login())
+
+        # Shielded so a cancelled caller does not abort the shared login
+        return await asyncio.shield(self._login_task)
+
+    async def _async_login(self):
+        try:
+            token = await self.async_get_token()
+            if not token:
+                _LOGGER.error("Failed to refresh token")
+                return False
+
+            self.token = token
+            self.metrics.token_refreshes += 1
+            self._schedule_renewal()
+            for listener in list(self._token_listeners):
+                listener()
+            return True
+        finally:
+            self._login_task = None
+
+    async def async_request_json(
+        self, method, url, priority=PRIORITY_POLL, retries=REQUEST_RETRIES, **kwargs
+    ):
+        """Send a request on the pooled client and decode its JSON body.
+
+        Transport errors, timeouts and 5xx responses are retried up to
+        ``retries`` times with jittered backoff, unless the endpoint's
+        circuit breaker opens in the meantime. A 429 is not retried while
+        it pauses the account, and a request that cannot get a scheduler
+        slot in time fails without counting against the breaker. Returns
+        None on failure.
+        """
+        breaker = self._breaker(url)
+        for attempt in range(retries + 1):
+            if not breaker.allow_request():
+                _LOGGER.debug("Skipping request to %s, circuit is open", url)
+                return None
+
+            try:
+                data, transient = await self._async_request_once(
+                    method, url, priority, kwargs
+                )
+            except NiuQueueTimeout as err:
+                breaker.release_probe()
+                _LOGGER.debug("Skipping request to %s: %s", url, err)
+                return None
+            except asyncio.CancelledError:
+                breaker.release_probe()
+                raise
+
+            if not transient:
+                breaker.record_success()
+                return data
+
+            breaker.record_failure()
+            if attempt == retries or breaker.is_open or self.scheduler.is_paused:
+                return None
+            await asyncio.sleep(retry_delay(attempt))
+
+        return None
+
+    async def async_get_thumbnail(self, url, headers=None):
+        """Download a track thumbnail; return the response, or None on failure.
+
+        Like the API requests, the download waits for a scheduler slot (of
+        background priority), goes through its circuit breaker and is
+        recorded in the metrics. A 304 counts as a successful response.
+        """
+        breaker = self._breaker(url)
+        if not breaker.allow_request():
+            _LOGGER.debug("Skipping thumbnail download, circuit is open")
+            return None
+
+        timeout, deadline = request_timeouts("thumbnail")
+        try:
+            await self.scheduler.async_acquire(PRIORITY_BACKGROUND)
+        except NiuQueueTimeout as err:
+            breaker.release_probe()
+            _LOGGER.debug("Skipping thumbnail download: %s", err)
+            return None
+
+        start = time.monotonic()
+        try:
+            async with asyncio.timeout(deadline):
+                response = await self.client.get(url, headers=headers, timeout=timeout)
+        except (TimeoutError, httpx.TimeoutException):
+            self.metrics.record(url, time.monotonic() - start, "timeout")
+            breaker.record_failure()
+            _LOGGER.debug("Thumbnail download from %s timed out", url)
+            return None
+        except asyncio.CancelledError:
+            self.metrics.record(url, time.monotonic() - start, "cancelled")
+            breaker.release_probe()
+            raise
+        except httpx.HTTPError as err:
+            self.metrics.record(url, time.monotonic() - start, "transport")
+            breaker.record_failure()
+            _LOGGER.debug("Thumbnail download from %s failed: %s", url, err)
+            return None
+
+        status = response.status_code
+        self.metrics.record(
+            url,
+            time.monotonic() - start,
+            None if status in (200, 304) else str(status),
+            len(response.content),
+        )
+        if status == 429:
+            self.scheduler.pause(_retry_after(response))
+        if status == 429 or status >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        return response
+
+    def _breaker(self, url) -> NiuCircuitBreaker:
+        name = endpoint_name(url)
+        breaker = self.breakers.get(name)
+        if breaker is None:
+            breaker = self.breakers[name] = NiuCircuitBreaker(name)
+        return breaker
+
+    async def _async_request_once(self, method, url, priority, kwargs):
+        """Send one request; return its JSON body and whether a failure is transient.
+
+        The request waits for a scheduler slot of ``priority`` first, at
+        most ``MAX_QUEUE_WAIT`` seconds. The HTTP exchange is bounded by the
+        endpoint's connect and read timeouts, and by cancelling it once
+        their sum has passed, which also releases its connection.
+        """
+        timeout, deadline = request_timeouts(endpoint_name(url))
+        await self.scheduler.async_acquire(priority)
+        start = time.monotonic()
+        try:
+            async with asyncio.timeout(deadline):
+                response = await self.client.request(
+                    method, url, timeout=timeout, **kwargs
+                )
+        except (TimeoutError, httpx.TimeoutException):
+            self.metrics.record(url, time.monotonic() - start, "timeout")
+            _LOGGER.debug("Request to %s timed out", url)
+            return None, True
+        except asyncio.CancelledError:
+            self.metrics.record(url, time.monotonic() - start, "cancelled")
+            raise
+        except httpx.HTTPError as err:
+            self.metrics.record(url, time.monotonic() - start, "transport")
+            _LOGGER.debug("Request to %s failed: %s", url, err)
+            return None, True
+
+        latency = time.monotonic() - start
+        size = len(response.content)
+        if response.status_code == 429:
+            self.scheduler.pause(_retry_after(response))
+        if response.status_code != 200:
+            self.metrics.record(url, latency, str(response.status_code), size)
+            _LOGGER.debug(
+                "Request to %s failed with status code: %s", url, response.status_code
+            )
+            return None, response.status_code == 429 or response.status_code >= 500
+
+        try:
+            data = json.loads(response.content.decode())
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            data = None
+
+        if not isinstance(data, dict):
+            self.metrics.record(url, latency, "invalid_json", size)
+            return None, False
+
+        self.metrics.record(url, latency, None, size)
+        return data, False
+
+    async def async_get_vehicles(self, force_refresh=False):
+        """Return the account's vehicle list, downloading it only when needed."""
+        async with self._vehicles_lock:
+            if not force_refresh:
+                if self.vehicles is None:
+                    await self._async_load_vehicles()
+                if self.vehicles is not None:
+                    if self._vehicles_expired():
+                        self._schedule_revalidation()
+                    return self.vehicles
+
+            return await self._async_fetch_vehicles()
+
+    def _vehicles_expired(self) -> bool:
+        return (
+            self.vehicles_fetched_at is None
+            or time.time() - self.vehicles_fetched_at
+            >= VEHICLE_LIST_TTL.total_seconds()
+        )
+
+    async def _async_load_vehicles(self) -> None:
+        if self._vehicles_store is None or self._vehicles_loaded:
+            return
+
+        self._vehicles_loaded = True
+        stored = await self._vehicles_store.async_load()
+        if stored and isinstance(stored.get("items"), list):
+            self.vehicles = stored["items"]
+            self.vehicles_fetched_at = stored.get("fetched_at")
+            _LOGGER.debug("Loaded stored NIU vehicle list")
+
+    def _schedule_revalidation(self) -> None:
+        if self.hass is None or self._revalidate_task is not None:
+            return
+
+        self._revalidate_task = self.hass.async_create_background_task(
+            self._async_revalidate_vehicles(), "niu_vehicle_list_revalidate"
+        )
+
+    async def _async_revalidate_vehicles(self) -> None:
+        try:
+            async with self._vehicles_lock:
+                if self._vehicles_expired():
+                    await self._async_fetch_vehicles()
+        finally:
+            self._revalidate_task = None
+
+    async def _async_fetch_vehicles(self):
+        """Download the vehicle list; the caller holds the vehicles lock."""
+        if not await self.async_ensure_valid_token():
+            return None
+
+        data = await self.async_request_json(
+            "GET",
+            API_BASE_URL + MOTOINFO_LIST_API_URI,
+            priority=PRIORITY_INTERACTIVE,
+            headers={"token": self.token},
+        )
+        if data is None or data.get("status") not in (None, 0):
+            return None
+
+        items = (data.get("data") or {}).get("items")
+        if not isinstance(items, list):
+            _LOGGER.error("Vehicle list response is missing items")
+            return None
+
+        items = [_trim_vehicle(item) for item in items]
+        changed = self.vehicles is not None and items != self.vehicles
+        self.vehicles = items
+        self.vehicles_fetched_at = time.time()
+        if self._vehicles_store is not None:
+            await self._vehicles_store.async_save(
+                {"items": items, "fetched_at": self.vehicles_fetched_at}
+            )
+
+        if changed:
+            _LOGGER.info("NIU vehicle list of the account changed")
+            for listener in list(self._vehicle_listeners):
+                listener()
+        return items
+
+
+def _vehicles_store(hass, username) -> Store[dict]:
+    account = hashlib.sha1(username.encode("utf-8")).hexdigest()[:16]
+    return Store(hass, VEHICLES_STORAGE_VERSION, f"{DOMAIN}.vehicles.{account}")
+
+
+async def async_remove_vehicles(hass, username) -> None:
+    """Delete the stored vehicle list of an account."""
+    await _vehicles_store(hass, username).async_remove()
+
+
+@callback
+def async_acquire_session(hass, username, password) -> NiuAccountSession:
+    """Return the shared session of an account, creating it if needed."""
+    sessions = hass.data.setdefault(DOMAIN, {}).setdefault(DATA_SESSIONS, {})
+    session = sessions.get(username)
+    if session is None:
+        session = sessions[username] = NiuAccountSession(username, password, hass)
+    else:
+        session.password = password
+
+    session.refcount += 1
+    return session
+
+
+async def async_release_session(hass, session: NiuAccountSession) -> None:
+    """Drop a reference to a session and tear it down after the last one."""
+    session.refcount -= 1
+    if session.refcount > 0:
+        return
+
+    sessions = hass.data.get(DOMAIN, {}).get(DATA_SESSIONS, {})
+    if sessions.get(session.username) is session:
+        sessions.pop(session.username)
+    await session.async_close()
@@ -0,0 +1,166 @@
+"""Flat, pre-parsed view of the NIU payloads shared by all entities."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from operator import attrgetter
+from time import gmtime, strftime
+from typing import Any
+
+from .const import (
+    BIN_SENSOR_TYPES,
+    SENSOR_TYPE_BAT,
+    SENSOR_TYPE_DIST,
+    SENSOR_TYPE_HISTORY,
+    SENSOR_TYPE_MOTO,
+    SENSOR_TYPE_OVERALL,
+    SENSOR_TYPE_POS,
+    SENSOR_TYPE_TRACK,
+    SENSOR_TYPES,
+)
+
+# Fields read outside of SENSOR_TYPES/BIN_SENSOR_TYPES, e.g. for attributes
+EXTRA_FIELDS = (
+    (SENSOR_TYPE_BAT, "bmsId"),
+    (SENSOR_TYPE_MOTO, "isAccOn"),
+    (SENSOR_TYPE_MOTO, "gsm"),
+    (SENSOR_TYPE_MOTO, "gps"),
+    (SENSOR_TYPE_DIST, "time"),
+    (SENSOR_TYPE_TRACK, "trackId"),
+)
+
+
+def field_key(group: str, field: str) -> str:
+    """Return the snapshot attribute holding ``field`` of ``group``."""
+    return f"{group.lower()}_{field}"
+
+
+def _format_timestamp(value):
+    return datetime.fromtimestamp(value / 1000).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _format_duration(value):
+    return strftime("%H:%M:%S", gmtime(value))
+
+
+def _overseas_thumb_url(value):
+    thumburl = value.replace("app-api.niucache.com", "app-api-fk.niu.com")
+    return thumburl.replace("/track/thumb/", "/track/overseas/thumb/")
+
+
+CONVERTERS = {
+    (SENSOR_TYPE_TRACK, "startTime"): _format_timestamp,
+    (SENSOR_TYPE_TRACK, "endTime"): _format_timestamp,
+    (SENSOR_TYPE_TRACK, "ridingtime"): _format_duration,
+    (SENSOR_TYPE_TRACK, "track_thumb"): _overseas_thumb_url,
+}
+
+
+def _collect_fields() -> dict[str, list[tuple[str, str]]]:
+    fields: dict[str, list[tuple[str, str]]] = {}
+    specs = [(grp, id_name) for _, _, id_name, grp, *_ in SENSOR_TYPES.values()]
+    specs += [(grp, id_name) for _, id_name, grp, *_ in BIN_SENSOR_TYPES.values()]
+    specs += EXTRA_FIELDS
+    for group, field in specs:
+        group_fields = fields.setdefault(group, [])
+        if (field, field_key(group, field)) not in group_fields:
+            group_fields.append((field, field_key(group, field)))
+
+    return fields
+
+
+SNAPSHOT_FIELDS = _collect_fields()
+
+
+def _group_source(group, bat, moto, moto_info, track, history) -> dict | None:
+    """Return the dict holding the raw fields of ``group``."""
+    try:
+        if group == SENSOR_TYPE_BAT:
+            return bat["data"]["batteries"]["compartmentA"]
+        if group == SENSOR_TYPE_MOTO:
+            return moto["data"]
+        if group == SENSOR_TYPE_DIST:
+            return moto["data"]["lastTrack"]
+        if group == SENSOR_TYPE_POS:
+            return moto["data"]["postion"]
+        if group == SENSOR_TYPE_OVERALL:
+            return moto_info["data"]
+        if group == SENSOR_TYPE_TRACK:
+            return track["data"][0]
+        if group == SENSOR_TYPE_HISTORY:
+            return history
+    except (KeyError, TypeError, IndexError):
+        return None
+    return None
+
+
+class NiuSnapshot:
+    """One refresh of NIU data parsed into plain attributes.
+
+    Payloads are walked and converted once per refresh; entities then read
+    their value with a precompiled accessor instead of nested lookups.
+    """
+
+    __slots__ = (
+        "has_data",
+        *(key for fields in SNAPSHOT_FIELDS.values() for _, key in fields),
+    )
+
+    def __init__(self) -> None:
+        self.has_data = False
+        for fields in SNAPSHOT_FIELDS.values():
+            for _, key in fields:
+                setattr(self, key, None)
+
+    @classmethod
+    def from_payloads(cls, bat, moto, moto_info, track, history=None) -> NiuSnapshot:
+        """Parse raw endpoint payloads and ride history totals into a snapshot."""
+        snapshot = cls()
+        snapshot.has_data = any(
+            data is not None for data in (bat, moto, moto_info, track)
+        )
+        for group, fields in SNAPSHOT_FIELDS.items():
+            source = _group_source(group, bat, moto, moto_info, track, history)
+            if not isinstance(source, dict):
+                continue
+
+            for field, key in fields:
+                value = source.get(field)
+                converter = CONVERTERS.get((group, field))
+                if value is not None and converter is not None:
+                    try:
+                        value = converter(value)
+                    except (TypeError, ValueError, AttributeError, OverflowError):
+                        value = None
+                setattr(snapshot, key, value)
+
+        return snapshot
+
+    def changed_fields(self, previous: NiuSnapshot) -> set[str]:
+        """Return the attributes whose value differs from ``previous``."""
+        return {
+            key
+            for key in self.__slots__
+            if getattr(self, key) != getattr(previous, key)
+        }
+
+    def as_dict(self) -> dict[str, Any]:
+        return {key: getattr(self, key) for key in self.__slots__}
+
+
+EMPTY_SNAPSHOT = NiuSnapshot()
+
+SENSOR_FIELD_KEYS = {
+    sensor: field_key(grp, id_name)
+    for sensor, (_, _, id_name, grp, *_) in SENSOR_TYPES.items()
+}
+BIN_SENSOR_FIELD_KEYS = {
+    sensor: field_key(grp, id_name)
+    for sensor, (_, id_name, grp, *_) in BIN_SENSOR_TYPES.items()
+}
+SENSOR_ACCESSORS = {
+    sensor: attrgetter(key) for sensor, key in SENSOR_FIELD_KEYS.items()
+}
+BIN_SENSOR_ACCESSORS = {
+    sensor: attrgetter(key) for sensor, key in BIN_SENSOR_FIELD_KEYS.items()
+}
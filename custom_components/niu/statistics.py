@@ -0,0 +1,219 @@
+"""Long-term statistics imported directly into the recorder."""
+
+from __future__ import annotations
+
+import asyncio
+from bisect import bisect_left
+from datetime import datetime, timedelta
+import logging
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, SENSOR_TYPE_BAT, SENSOR_TYPE_OVERALL
+from .history import NiuRideHistory
+from .snapshot import NiuSnapshot, field_key
+
+_LOGGER = logging.getLogger(__name__)
+
+HOUR = timedelta(hours=1)
+# Rides are bucketed by end time; no ride is expected to last longer than this
+MAX_RIDE_DURATION = timedelta(days=1)
+
+
+def _float(value) -> float | None:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _hour_start(moment: datetime) -> datetime:
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+class NiuStatistics:
+    """Hourly battery, odometer and ride distance statistics of one scooter.
+
+    Polled values are buffered per hour and written in one batch per
+    statistic once the hour is over, instead of going through per-state
+    recorder writes. Ride distance is computed from the local ride history,
+    so hours in which Home Assistant was not running are backfilled too.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, sn: str, name: str, history: NiuRideHistory
+    ) -> None:
+        self.hass = hass
+        self.sn = sn
+        self.name = name
+        self.history = history
+        self._battery: dict[datetime, list[float]] = {}
+        self._mileage: dict[datetime, float] = {}
+        self._ride_imported_until: datetime | None = None
+        self._ride_sum = 0.0
+        self._ride_checked_until: datetime | None = None
+        self._lock = asyncio.Lock()
+
+    def statistic_id(self, kind: str) -> str:
+        return f"{DOMAIN}:{self.sn.lower()}_{kind}"
+
+    @callback
+    def async_add_snapshot(self, snapshot: NiuSnapshot, now=None) -> None:
+        """Buffer the values of a refresh in the bucket of the current hour."""
+        if "recorder" not in self.hass.config.components:
+            return
+        hour = _hour_start(now or dt_util.utcnow())
+        battery = _float(
+            getattr(snapshot, field_key(SENSOR_TYPE_BAT, "batteryCharging"))
+        )
+        if battery is not None:
+            self._battery.setdefault(hour, []).append(battery)
+        mileage = _float(
+            getattr(snapshot, field_key(SENSOR_TYPE_OVERALL, "totalMileage"))
+        )
+        if mileage is not None:
+            self._mileage[hour] = mileage
+
+    def has_pending(self, now=None) -> bool:
+        """Return True when a completed hour has not been imported yet."""
+        hour = _hour_start(now or dt_util.utcnow())
+        ride_until = self._ride_until(hour)
+        if ride_until is not None and (
+            self._ride_checked_until is None or self._ride_checked_until < ride_until
+        ):
+            return True
+        return any(bucket < hour for bucket in (*self._battery, *self._mileage))
+
+    async def async_flush(self, now=None) -> None:
+        """Import every completed hour, one batch per statistic."""
+        if "recorder" not in self.hass.config.components:
+            return
+
+        from homeassistant.components.recorder.models import (
+            StatisticData,
+            StatisticMetaData,
+        )
+        from homeassistant.components.recorder.statistics import (
+            async_add_external_statistics,
+        )
+
+        current_hour = _hour_start(now or dt_util.utcnow())
+        async with self._lock:
+            battery_rows = [
+                StatisticData(
+                    start=hour,
+                    mean=sum(values) / len(values),
+                    min=min(values),
+                    max=max(values),
+                )
+                for hour, values in sorted(self._battery.items())
+                if hour < current_hour
+            ]
+            mileage_rows = [
+                StatisticData(start=hour, state=value, sum=value)
+                for hour, value in sorted(self._mileage.items())
+                if hour < current_hour
+            ]
+            ride_rows = [
+                StatisticData(start=hour, state=distance, sum=total)
+                for hour, distance, total in await self._async_ride_rows(current_hour)
+            ]
+
+            for kind, name, unit, has_mean, rows in (
+                ("battery", "Battery", "%", True, battery_rows),
+                ("mileage", "Total mileage", "km", False, mileage_rows),
+                ("ride_distance", "Ride distance", "km", False, ride_rows),
+            ):
+                if not rows:
+                    continue
+                async_add_external_statistics(
+                    self.hass,
+                    StatisticMetaData(
+                        has_mean=has_mean,
+                        has_sum=not has_mean,
+                        name=f"{self.name} {name}",
+                        source=DOMAIN,
+                        statistic_id=self.statistic_id(kind),
+                        unit_of_measurement=unit,
+                    ),
+                    rows,
+                )
+                _LOGGER.debug("Imported %s hours of %s statistics", len(rows), kind)
+
+            for buffer in (self._battery, self._mileage):
+                for hour in [hour for hour in buffer if hour < current_hour]:
+                    del buffer[hour]
+
+    async def _async_load_ride_sum(self) -> None:
+        """Continue the ride distance sum from the last imported hour."""
+        from homeassistant.components.recorder import get_instance
+        from homeassistant.components.recorder.statistics import get_last_statistics
+
+        statistic_id = self.statistic_id("ride_distance")
+        last = await get_instance(self.hass).async_add_executor_job(
+            get_last_statistics, self.hass, 1, statistic_id, True, {"sum"}
+        )
+        rows = last.get(statistic_id)
+        if not rows:
+            self._ride_imported_until = datetime.min.replace(tzinfo=dt_util.UTC)
+            return
+
+        start = rows[0]["start"]
+        if not isinstance(start, datetime):
+            start = dt_util.utc_from_timestamp(start)
+        self._ride_imported_until = start + HOUR
+        self._ride_sum = rows[0]["sum"] or 0.0
+
+    def _ride_until(self, current_hour: datetime) -> datetime | None:
+        """Return the start of the first hour whose rides may not be synced.
+
+        The history only holds every ride that ended before its last
+        completed sync, so hours from the one that sync ran in are left for
+        a later flush.
+        """
+        synced_at = self.history.synced_at
+        if not self.history.backfill_complete or synced_at is None:
+            return None
+        return min(current_hour, _hour_start(synced_at))
+
+    async def _async_ride_rows(self, current_hour: datetime):
+        """Return ``(hour, km, running km)`` for rides ended in new hours.
+
+        Only hours that ended before the last completed history sync are
+        returned, so a ride synced after a flush is never skipped.
+        """
+        until = self._ride_until(current_hour)
+        if until is None:
+            return []
+        if self._ride_imported_until is None:
+            await self._async_load_ride_sum()
+        self._ride_checked_until = until
+        earliest = self._ride_imported_until
+        if until <= earliest:
+            return []
+
+        columns = self.history.columns
+        first = datetime.min.replace(tzinfo=dt_util.UTC)
+        index = 0
+        if earliest > first + MAX_RIDE_DURATION:
+            index = bisect_left(
+                columns.start, int((earliest - MAX_RIDE_DURATION).timestamp() * 1000)
+            )
+
+        hourly: dict[datetime, float] = {}
+        for position in range(index, len(columns)):
+            end = columns.end[position]
+            if not end:
+                continue
+            hour = _hour_start(dt_util.utc_from_timestamp(end / 1000))
+            if earliest <= hour < until:
+                hourly[hour] = hourly.get(hour, 0.0) + columns.distance[position]
+
+        rows = []
+        for hour in sorted(hourly):
+            distance = round(hourly[hour] / 1000, 3)
+            self._ride_sum = round(self._ride_sum + distance, 3)
+            rows.append((hour, distance, self._ride_sum))
+        self._ride_imported_until = until
+        return rows
@@ -2,7 +2,6 @@
 
 from __future__ import annotations
 
-import asyncio
 import logging
 from typing import Any
 
@@ -37,7 +36,9 @@ class NiuIgnitionSwitch(CoordinatorEntity, SwitchEntity):
 
     def __init__(self, coordinator) -> None:
         """Initialize the switch."""
-        super().__init__(coordinator)
+        super().__init__(
+            coordinator, context=frozenset({"moto_isAccOn", "has_data"})
+        )
         self._attr_name = f"{coordinator.metadata.sensor_prefix} Ignition"
         self._attr_unique_id = f"{coordinator.metadata.sn}_ignition"
         self._attr_device_class = SwitchDeviceClass.SWITCH
@@ -47,7 +48,10 @@ class NiuIgnitionSwitch(CoordinatorEntity, SwitchEntity):
     @property
     def is_on(self) -> bool:
         """Return true if the switch is on."""
-        state = self.coordinator.api.getDataMoto("isAccOn")
+        if self.coordinator.pending_ignition is not None:
+            return self.coordinator.pending_ignition
+
+        state = self.coordinator.snapshot.moto_isAccOn
         if state is not None:
             self._last_is_on = bool(state)
 
@@ -56,7 +60,7 @@ class NiuIgnitionSwitch(CoordinatorEntity, SwitchEntity):
     @property
     def available(self) -> bool:
         """Return True if entity is available."""
-        return self.coordinator.last_update_success or self.coordinator.api.has_snapshot_data()
+        return self.coordinator.last_update_success or self.coordinator.snapshot.has_data
 
     @property
     def device_info(self):
@@ -71,18 +75,10 @@ class NiuIgnitionSwitch(CoordinatorEntity, SwitchEntity):
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn the switch on."""
-        result = await self.coordinator.async_set_ignition(True)
-        if result:
-            self._last_is_on = True
-            self.async_write_ha_state()
-            await asyncio.sleep(5)
-            await self.coordinator.async_refresh()
+        if not await self.coordinator.async_set_ignition(True):
+            _LOGGER.error("Unable to turn on NIU scooter ignition")
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn the switch off."""
-        result = await self.coordinator.async_set_ignition(False)
-        if result:
-            self._last_is_on = False
-            self.async_write_ha_state()
-            await asyncio.sleep(5)
-            await self.coordinator.async_refresh()
+        if not await self.coordinator.async_set_ignition(False):
+            _LOGGER.error("Unable to turn off NIU scooter ignition")
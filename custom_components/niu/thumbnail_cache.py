@@ -0,0 +1,161 @@
+"""Persistent cache of last track thumbnails."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass
+import hashlib
+import logging
+import os
+import time
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import STORAGE_DIR, Store
+
+from .const import DATA_THUMBNAIL_CACHE, DOMAIN, THUMB_CACHE_DIR, THUMB_CACHE_MAX_BYTES
+from .executor import async_run_blocking
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+STORAGE_KEY = f"{DOMAIN}.thumbnails"
+
+
+@dataclass(slots=True)
+class CachedThumbnail:
+    """A cached image together with its HTTP validators."""
+
+    body: bytes
+    etag: str | None
+    last_modified: str | None
+    validated_at: float
+
+
+def _read_file(path):
+    with open(path, "rb") as file:
+        return file.read()
+
+
+def _write_file(directory, path, body):
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(body)
+    os.replace(tmp_path, path)
+
+
+def _remove_files(paths):
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+class NiuThumbnailCache:
+    """Size-bounded LRU of thumbnails stored under the config directory.
+
+    Images are keyed by track id and URL. The index with the HTTP validators
+    and the LRU order lives in a Store, so cached images survive restarts.
+    """
+
+    def __init__(self, hass: HomeAssistant, max_bytes=THUMB_CACHE_MAX_BYTES) -> None:
+        self.hass = hass
+        self.max_bytes = max_bytes
+        self.directory = hass.config.path(STORAGE_DIR, THUMB_CACHE_DIR)
+        self._store: Store[dict] = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._index: OrderedDict[str, dict] = OrderedDict()
+        self._load_lock = asyncio.Lock()
+        self._loaded = False
+
+    @staticmethod
+    def _key(track_id, url) -> str:
+        return hashlib.sha1(f"{track_id}|{url}".encode("utf-8")).hexdigest()
+
+    def _path(self, key) -> str:
+        return os.path.join(self.directory, f"{key}.img")
+
+    @property
+    def size(self) -> int:
+        return sum(item["size"] for item in self._index.values())
+
+    async def async_load(self) -> None:
+        async with self._load_lock:
+            if self._loaded:
+                return
+
+            stored = await self._store.async_load() or {}
+            for item in stored.get("items", []):
+                self._index[item["key"]] = item
+            self._loaded = True
+
+    def _schedule_save(self) -> None:
+        self._store.async_delay_save(lambda: {"items": list(self._index.values())}, 10)
+
+    async def async_get(self, track_id, url) -> CachedThumbnail | None:
+        """Return the cached thumbnail, marking it as recently used."""
+        key = self._key(track_id, url)
+        item = self._index.get(key)
+        if item is None:
+            return None
+
+        try:
+            body = await async_run_blocking(self.hass, _read_file, self._path(key))
+        except OSError:
+            self._index.pop(key, None)
+            self._schedule_save()
+            return None
+
+        self._index.move_to_end(key)
+        self._schedule_save()
+        return CachedThumbnail(
+            body, item.get("etag"), item.get("last_modified"), item["validated_at"]
+        )
+
+    async def async_put(
+        self, track_id, url, body: bytes, etag=None, last_modified=None
+    ) -> None:
+        """Store a downloaded thumbnail and evict the least recently used ones."""
+        key = self._key(track_id, url)
+        await async_run_blocking(
+            self.hass, _write_file, self.directory, self._path(key), body
+        )
+        self._index[key] = {
+            "key": key,
+            "size": len(body),
+            "etag": etag,
+            "last_modified": last_modified,
+            "validated_at": time.time(),
+        }
+        self._index.move_to_end(key)
+
+        evicted = []
+        total = self.size
+        while total > self.max_bytes and len(self._index) > 1:
+            old_key, old_item = self._index.popitem(last=False)
+            total -= old_item["size"]
+            evicted.append(self._path(old_key))
+        if evicted:
+            _LOGGER.debug("Evicting %s cached NIU thumbnails", len(evicted))
+            await async_run_blocking(self.hass, _remove_files, evicted)
+
+        self._schedule_save()
+
+    def touch(self, track_id, url) -> None:
+        """Record that a cached thumbnail was revalidated by the server."""
+        item = self._index.get(self._key(track_id, url))
+        if item is not None:
+            item["validated_at"] = time.time()
+            self._schedule_save()
+
+
+async def async_get_thumbnail_cache(hass: HomeAssistant) -> NiuThumbnailCache:
+    """Return the thumbnail cache shared by every config entry."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    cache = domain_data.get(DATA_THUMBNAIL_CACHE)
+    if cache is None:
+        cache = domain_data[DATA_THUMBNAIL_CACHE] = NiuThumbnailCache(hass)
+
+    await cache.async_load()
+    return cache